@@ -1,26 +1,64 @@
+import logging
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from routers import core, items, news
-from lib.middleware.logging import LoggingMiddleware
+from sqlalchemy.orm import configure_mappers
+from fastapi.responses import PlainTextResponse
+from routers import admin, core, items, news
+from lib.middleware.logging import LoggingMiddleware, setup_access_log
+from lib.middleware.metrics import MetricsMiddleware
+from lib import metrics
+from lib.cache.backend import response_cache
+from lib.db.engine import init_engine, dispose_engine, pool_stats, warm_pool
+from lib.config import DB_POOL_WARMUP
+from lib.startup import timed
+
+startup_logger = logging.getLogger("app.startup")
+
+async def prime_statements(db):
+    await items.prime_statements(db)
+    await news.prime_statements(db)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    access_log = setup_access_log()
+    # Otherwise paid by the first request that touches a model
+    with timed("configure_mappers"):
+        configure_mappers()
+    init_engine()
+    await response_cache.start()
+    if DB_POOL_WARMUP > 0:
+        try:
+            with timed("pool_warmup"):
+                await warm_pool(DB_POOL_WARMUP, prime_statements)
+        except Exception as e:
+            # Connections are still opened on demand; an unreachable database shouldn't keep the worker from starting
+            startup_logger.warning("Pool warmup failed: %r", e)
+    try:
+        yield
+    finally:
+        await response_cache.close()
+        await dispose_engine()
+        if access_log:
+            access_log.stop()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add middleware
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(core.router, prefix="/core", tags=["Core"])
 app.include_router(items.router, prefix="/items", tags=["Items"])
 app.include_router(news.router, prefix="/news", tags=["News"])
-
-async def startup_event():
-    print("Startup")
-
-async def shutdown_event():
-    print("Shutdown")
-
-app.add_event_handler("startup", startup_event)
-app.add_event_handler("shutdown", shutdown_event)
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the FastAPI app!"}
\ No newline at end of file
+    return {"message": "Welcome to the FastAPI app!"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(pool_stats()), media_type="text/plain; version=0.0.4")
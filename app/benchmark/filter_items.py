@@ -0,0 +1,152 @@
+"""
+Compares the legacy single GROUP BY filter query with the two-phase
+`filter_items` queries on a catalog where every item has many
+characteristics and reviews. The two phases run directly, bypassing the
+response cache, so every run reaches the database.
+
+    python -m benchmark.filter_items --items 200 --characteristics 40 --reviews 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from uuid import uuid4
+
+from sqlalchemy import select, func, delete, insert
+
+from lib.db.engine import SessionLocal, db_execute, init_engine, dispose_engine
+from models.app.request import ItemFilterRequest
+from models.db import Item, Category, Characteristic, ItemCharacteristic, Review
+from routers.items import _ITEM_FIELDS, _filter_shape, _item_relations, _items_page_params, _items_page_statement
+
+BATCH_SIZE = 5000
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Benchmark /items/filter query shapes.")
+    parser.add_argument('--items', type=int, help='Items to seed', default=200)
+    parser.add_argument('--characteristics', type=int, help='Characteristics per item', default=40)
+    parser.add_argument('--reviews', type=int, help='Reviews per item', default=500)
+    parser.add_argument('--limit', type=int, help='Page size', default=20)
+    parser.add_argument('--runs', type=int, help='Timed runs per variant', default=10)
+    return parser.parse_args()
+
+
+async def _insert_batched(session, model, rows):
+    for i in range(0, len(rows), BATCH_SIZE):
+        await session.execute(insert(model), rows[i:i + BATCH_SIZE])
+
+
+async def seed(session, args) -> tuple:
+    category_id = uuid4()
+    characteristic_ids = [uuid4() for _ in range(args.characteristics)]
+    item_ids = [uuid4() for _ in range(args.items)]
+
+    await session.execute(insert(Category).values(id=category_id, name=f"bench-{category_id}", description=""))
+    await _insert_batched(session, Characteristic, [
+        {"id": id, "name": f"bench-char-{n}", "description": ""} for n, id in enumerate(characteristic_ids)
+    ])
+    await _insert_batched(session, Item, [
+        {"id": id, "name": f"bench-item-{n}", "description": "", "price": n + 1, "category_id": category_id}
+        for n, id in enumerate(item_ids)
+    ])
+    await _insert_batched(session, ItemCharacteristic, [
+        {"item_id": item_id, "characteristic_id": char_id, "value": str(n)}
+        for item_id in item_ids for n, char_id in enumerate(characteristic_ids)
+    ])
+    await _insert_batched(session, Review, [
+        {"item_id": item_id, "name": f"review-{n}", "description": "", "stars": n % 5 + 1}
+        for item_id in item_ids for n in range(args.reviews)
+    ])
+    await session.commit()
+    return category_id, characteristic_ids, item_ids
+
+
+async def cleanup(session, category_id, characteristic_ids, item_ids):
+    await session.execute(delete(Review).where(Review.item_id.in_(item_ids)))
+    await session.execute(delete(ItemCharacteristic).where(ItemCharacteristic.item_id.in_(item_ids)))
+    await session.execute(delete(Item).where(Item.id.in_(item_ids)))
+    await session.execute(delete(Characteristic).where(Characteristic.id.in_(characteristic_ids)))
+    await session.execute(delete(Category).where(Category.id == category_id))
+    await session.commit()
+
+
+def legacy_query(category_id, limit: int):
+    return select(
+        func.count(Item.id).over().label("count"),
+        Item,
+        Category,
+        func.array_agg(
+            func.jsonb_build_object(
+                "id", Characteristic.id,
+                "name", Characteristic.name,
+                "value", ItemCharacteristic.value
+            ).distinct()
+        ).label("characteristics"),
+        func.array_agg(
+            func.jsonb_build_object(
+                "id", Review.id,
+                "name", Review.name,
+                "description", Review.description,
+                "stars", Review.stars,
+                "created_at", Review.created_at
+            ).distinct()
+        ).label("reviews")
+    ).outerjoin(
+        Category, Item.category_id == Category.id
+    ).outerjoin(
+        ItemCharacteristic, Item.id == ItemCharacteristic.item_id
+    ).outerjoin(
+        Characteristic, ItemCharacteristic.characteristic_id == Characteristic.id
+    ).outerjoin(
+        Review, Item.id == Review.item_id
+    ).where(
+        Item.category_id == category_id
+    ).order_by(Item.price).limit(limit).group_by(Item.id, Category.id)
+
+
+async def timed(runs: int, call) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    print(
+        f"{name:<10} median {statistics.median(timings):9.2f} ms  "
+        f"min {min(timings):9.2f} ms  max {max(timings):9.2f} ms"
+    )
+
+
+async def main(args):
+    init_engine()
+    async with SessionLocal() as session:
+        category_id, characteristic_ids, item_ids = await seed(session, args)
+        try:
+            async def run_legacy():
+                await session.execute(legacy_query(category_id, args.limit))
+
+            request = ItemFilterRequest(category=category_id, limit=args.limit)
+
+            async def run_two_phase():
+                items = await db_execute(
+                    session, _items_page_statement(_filter_shape(request, _ITEM_FIELDS)),
+                    with_result="raw_all", params=_items_page_params(request)
+                )
+                await _item_relations(session, _ITEM_FIELDS, [item.id for item in items])
+
+            await run_legacy()
+            await run_two_phase()
+            report("legacy", await timed(args.runs, run_legacy))
+            report("two-phase", await timed(args.runs, run_two_phase))
+        finally:
+            await cleanup(session, category_id, characteristic_ids, item_ids)
+    await dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(get_args()))
@@ -0,0 +1,223 @@
+"""
+Deterministic catalog for load tests. Ids are derived from the seed and a
+row number, so the load driver can address rows without reading them back.
+
+    python -m benchmark.generator --scale 100k --truncate
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import insert, text
+
+from lib.config import DB_SCHEMA
+from lib.db.engine import SessionLocal, init_engine, dispose_engine
+from lib.db.ratings import backfill_ratings
+from models.db import Item, Category, Characteristic, ItemCharacteristic, Review, News
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BATCH_SIZE = 5000
+
+WORDS = (
+    "red", "blue", "green", "black", "white", "steel", "wood", "glass", "cotton", "leather",
+    "compact", "large", "portable", "wireless", "classic", "modern", "premium", "budget", "pro", "mini"
+)
+EPOCH = datetime(2024, 1, 1)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    items: int
+    seed: int = 0
+    items_per_category: int = 1000
+    characteristics: int = 200
+    characteristics_per_item: int = 8
+    values_per_characteristic: int = 10
+    reviews_per_item: int = 5
+    items_per_news: int = 100
+    reviews_per_news: int = 3
+
+    @property
+    def categories(self) -> int:
+        return max(self.items // self.items_per_category, 1)
+
+    @property
+    def news(self) -> int:
+        return max(self.items // self.items_per_news, 1)
+
+    def id(self, kind: str, n: int) -> UUID:
+        digest = hashlib.md5(f"{self.seed}:{kind}:{n}".encode()).digest()
+        return UUID(bytes=digest, version=4)
+
+    def rng(self, kind: str, n: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{n}")
+
+    def item_characteristics(self, n: int) -> list[tuple[int, str]]:
+        rng = self.rng("item_characteristics", n)
+        return [
+            (c, str(rng.randrange(self.values_per_characteristic)))
+            for c in rng.sample(range(self.characteristics), self.characteristics_per_item)
+        ]
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def category_rows(catalog: Catalog, start: int, stop: int) -> list[dict]:
+    return [
+        {"id": catalog.id("category", n), "name": f"category {n}", "description": _words(catalog.rng("category", n), 6)}
+        for n in range(start, stop)
+    ]
+
+
+def characteristic_rows(catalog: Catalog, start: int, stop: int) -> list[dict]:
+    return [
+        {"id": catalog.id("characteristic", n), "name": f"characteristic {n}", "description": ""}
+        for n in range(start, stop)
+    ]
+
+
+def item_rows(catalog: Catalog, start: int, stop: int) -> list[dict]:
+    rows = []
+    for n in range(start, stop):
+        rng = catalog.rng("item", n)
+        created_at = EPOCH + timedelta(minutes=n)
+        rows.append({
+            "id": catalog.id("item", n),
+            "name": f"{_words(rng, 2)} {n}",
+            "description": _words(rng, 12),
+            "price": round(rng.uniform(1, 1000), 2),
+            "category_id": catalog.id("category", n % catalog.categories),
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(minutes=rng.randrange(60 * 24 * 30))
+        })
+    return rows
+
+
+def item_characteristic_rows(catalog: Catalog, start: int, stop: int) -> list[dict]:
+    return [
+        {"item_id": catalog.id("item", n), "characteristic_id": catalog.id("characteristic", c), "value": value}
+        for n in range(start, stop) for c, value in catalog.item_characteristics(n)
+    ]
+
+
+def item_review_rows(catalog: Catalog, start: int, stop: int) -> list[dict]:
+    rows = []
+    for n in range(start, stop):
+        rng = catalog.rng("item_reviews", n)
+        rows += [
+            {
+                "item_id": catalog.id("item", n),
+                "name": f"review {r}",
+                "description": _words(rng, 20),
+                "stars": rng.randint(1, 5),
+                "created_at": EPOCH + timedelta(minutes=n, seconds=r)
+            }
+            for r in range(catalog.reviews_per_item)
+        ]
+    return rows
+
+
+def news_rows(catalog: Catalog, start: int, stop: int) -> list[dict]:
+    rows = []
+    for n in range(start, stop):
+        rng = catalog.rng("news", n)
+        created_at = EPOCH + timedelta(hours=n)
+        rows.append({
+            "id": catalog.id("news", n),
+            "name": f"{_words(rng, 4)} {n}",
+            "description": _words(rng, 40),
+            "created_at": created_at,
+            "updated_at": created_at
+        })
+    return rows
+
+
+def news_review_rows(catalog: Catalog, start: int, stop: int) -> list[dict]:
+    rows = []
+    for n in range(start, stop):
+        rng = catalog.rng("news_reviews", n)
+        rows += [
+            {
+                "news_id": catalog.id("news", n),
+                "name": f"review {r}",
+                "description": _words(rng, 20),
+                "stars": rng.randint(1, 5),
+                "created_at": EPOCH + timedelta(hours=n, seconds=r)
+            }
+            for r in range(catalog.reviews_per_news)
+        ]
+    return rows
+
+
+async def _insert_chunked(session, model, rows_factory, catalog: Catalog, total: int, per_row: int = 1):
+    # Chunks are sized in inserted rows, so fan-out tables don't build huge parameter lists
+    step = max(BATCH_SIZE // per_row, 1)
+    for start in range(0, total, step):
+        await session.execute(insert(model), rows_factory(catalog, start, min(start + step, total)))
+        await session.commit()
+
+
+async def truncate(session):
+    tables = ", ".join(f"{DB_SCHEMA}.{model.__tablename__}" for model in (
+        Review, ItemCharacteristic, Item, News, Characteristic, Category
+    ))
+    await session.execute(text(f"TRUNCATE {tables}"))
+    await session.commit()
+
+
+async def seed(session, catalog: Catalog):
+    await _insert_chunked(session, Category, category_rows, catalog, catalog.categories)
+    await _insert_chunked(session, Characteristic, characteristic_rows, catalog, catalog.characteristics)
+    await _insert_chunked(session, Item, item_rows, catalog, catalog.items)
+    await _insert_chunked(
+        session, ItemCharacteristic, item_characteristic_rows, catalog, catalog.items, catalog.characteristics_per_item
+    )
+    await _insert_chunked(session, Review, item_review_rows, catalog, catalog.items, catalog.reviews_per_item)
+    await _insert_chunked(session, News, news_rows, catalog, catalog.news)
+    await _insert_chunked(session, Review, news_review_rows, catalog, catalog.news, catalog.reviews_per_news)
+    await backfill_ratings(session, Item, Review.item_id, Review.stars, BATCH_SIZE)
+    await backfill_ratings(session, News, Review.news_id, Review.stars, BATCH_SIZE)
+    await session.execute(text("ANALYZE"))
+    await session.commit()
+
+
+def add_catalog_args(parser: argparse.ArgumentParser):
+    parser.add_argument('--scale', choices=SCALES, help='Items to generate', default="10k")
+    parser.add_argument('--seed', type=int, help='Seed for ids and content', default=0)
+
+
+def catalog_from_args(args) -> Catalog:
+    return Catalog(items=SCALES[args.scale], seed=args.seed)
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Seed a deterministic benchmark catalog.")
+    add_catalog_args(parser)
+    parser.add_argument('--truncate', action='store_true', help='Empty the catalog tables first')
+    return parser.parse_args()
+
+
+async def main(args):
+    catalog = catalog_from_args(args)
+    init_engine()
+    try:
+        async with SessionLocal() as session:
+            if args.truncate:
+                await truncate(session)
+            started = time.perf_counter()
+            await seed(session, catalog)
+            print(f"seeded {catalog.items} items, {catalog.news} news in {time.perf_counter() - started:.1f} s")
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(get_args()))
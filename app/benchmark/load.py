@@ -0,0 +1,172 @@
+"""
+Drives the API with scenario mixes against a catalog seeded by
+`benchmark.generator` (same --scale and --seed), in-process through the ASGI
+transport or against a running server with --url, and writes a JSON report.
+
+    python -m benchmark.load --scale 100k --requests 500 --concurrency 20 --output current.json
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmark.generator import Catalog, WORDS, add_catalog_args, catalog_from_args
+from benchmark.report import build_report, print_report, save, summarize
+
+Call = tuple[str, str, dict | None]
+
+
+def items_filter_category(catalog: Catalog, rng: random.Random) -> Call:
+    category = catalog.id("category", rng.randrange(catalog.categories))
+    return "POST", "/items/filter", {"category": str(category), "limit": 20}
+
+
+def items_filter_price(catalog: Catalog, rng: random.Random) -> Call:
+    low = rng.randrange(1, 900)
+    return "POST", "/items/filter", {"min_price": low, "max_price": low + 50, "sort_by": "price", "limit": 20}
+
+
+def items_filter_characteristics(catalog: Catalog, rng: random.Random) -> Call:
+    # Taken from an existing item so the intersection is never empty
+    pairs = rng.sample(catalog.item_characteristics(rng.randrange(catalog.items)), 2)
+    return "POST", "/items/filter", {
+        "characteristics": [{"id": str(catalog.id("characteristic", c)), "value": value} for c, value in pairs],
+        "limit": 20
+    }
+
+
+def items_filter_keywords(catalog: Catalog, rng: random.Random) -> Call:
+    return "POST", "/items/filter", {
+        "keywords": rng.choice(WORDS), "sort_by": "relevance", "sort_dir": "desc", "count_mode": "estimate", "limit": 20
+    }
+
+
+def items_filter_deep_page(catalog: Catalog, rng: random.Random) -> Call:
+    return "POST", "/items/filter", {"page": rng.randrange(10, 100), "sort_by": "created_at", "limit": 20}
+
+
+def items_grid(catalog: Catalog, rng: random.Random) -> Call:
+    category = catalog.id("category", rng.randrange(catalog.categories))
+    return "POST", "/items/filter", {"category": str(category), "fields": ["name", "price", "category"], "limit": 40}
+
+
+def items_top_rated(catalog: Catalog, rng: random.Random) -> Call:
+    return "POST", "/items/filter", {"min_rating": rng.choice((3, 4)), "sort_by": "rating", "sort_dir": "desc", "limit": 20}
+
+
+def item_detail(catalog: Catalog, rng: random.Random) -> Call:
+    return "GET", f"/items/{catalog.id('item', rng.randrange(catalog.items))}", None
+
+
+def news_list(catalog: Catalog, rng: random.Random) -> Call:
+    return "GET", f"/news/?limit=20&page={rng.randrange(1, 10)}", None
+
+
+def core_category_list(catalog: Catalog, rng: random.Random) -> Call:
+    return "GET", f"/core/category/list?limit=20&page={rng.randrange(1, 5)}", None
+
+
+def core_characteristic_list(catalog: Catalog, rng: random.Random) -> Call:
+    return "GET", f"/core/characteristic/list?limit=20&page={rng.randrange(1, 5)}", None
+
+
+SCENARIOS = {
+    call.__name__: call for call in (
+        items_filter_category,
+        items_filter_price,
+        items_filter_characteristics,
+        items_filter_keywords,
+        items_filter_deep_page,
+        items_grid,
+        items_top_rated,
+        item_detail,
+        news_list,
+        core_category_list,
+        core_characteristic_list
+    )
+}
+
+
+async def run_calls(client: httpx.AsyncClient, calls: list[Call], concurrency: int) -> tuple[list[float], int, float]:
+    latencies = []
+    errors = 0
+    pending = iter(calls)
+
+    async def worker():
+        nonlocal errors
+        for method, url, body in pending:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if failed:
+                errors += 1
+            else:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(client: httpx.AsyncClient, catalog: Catalog, args) -> dict:
+    results = {}
+    all_latencies, all_errors, all_elapsed = [], 0, 0.0
+    for name in args.scenarios:
+        rng = random.Random(f"{args.seed}:{name}")
+        calls = [SCENARIOS[name](catalog, rng) for _ in range(args.warmup + args.requests)]
+        await run_calls(client, calls[:args.warmup], args.concurrency)
+        latencies, errors, elapsed = await run_calls(client, calls[args.warmup:], args.concurrency)
+        results[name] = summarize(latencies, errors, elapsed)
+        all_latencies += latencies
+        all_errors += errors
+        all_elapsed += elapsed
+
+    config = {
+        "scale": args.scale, "items": catalog.items, "seed": args.seed, "requests": args.requests,
+        "warmup": args.warmup, "concurrency": args.concurrency, "target": args.url or "asgi"
+    }
+    return build_report(config, results, summarize(all_latencies, all_errors, all_elapsed))
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Load test the API against a generated catalog.")
+    add_catalog_args(parser)
+    parser.add_argument('--scenarios', type=lambda s: s.split(","), help='Comma separated scenario names',
+                        default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, help='Timed requests per scenario', default=200)
+    parser.add_argument('--warmup', type=int, help='Untimed requests per scenario', default=20)
+    parser.add_argument('--concurrency', type=int, help='Concurrent clients', default=10)
+    parser.add_argument('--url', help='Base URL of a running server; in-process ASGI when omitted', default=None)
+    parser.add_argument('--output', help='Where to save the JSON report', default="benchmark-report.json")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+async def main(args):
+    catalog = catalog_from_args(args)
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+            report = await run(client, catalog, args)
+    else:
+        from app import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                report = await run(client, catalog, args)
+
+    print_report(report)
+    save(report, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(get_args()))
@@ -0,0 +1,95 @@
+"""
+Latency percentiles and throughput per scenario, saved as JSON so runs can be
+compared.
+
+    python -m benchmark.report baseline.json current.json
+"""
+import argparse
+import json
+import math
+import platform
+import subprocess
+
+from datetime import datetime, timezone
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies_ms: list[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies_ms)
+    summary = {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+        "max_ms": round(values[-1], 3) if values else 0.0
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = round(percentile(values, p), 3)
+    return summary
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(config: dict, scenarios: dict[str, dict], total: dict) -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": config,
+        "total": total,
+        "scenarios": scenarios
+    }
+
+
+def save(report: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def print_report(report: dict):
+    print(f"{'scenario':<24} {'requests':>8} {'errors':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, s in (*report["scenarios"].items(), ("total", report["total"])):
+        print(
+            f"{name:<24} {s['requests']:>8} {s['errors']:>6} {s['throughput_rps']:>9.1f} "
+            f"{s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f}"
+        )
+
+
+def compare(baseline: dict, current: dict):
+    print(f"{'scenario':<24} {'metric':<15} {'baseline':>10} {'current':>10} {'change':>8}")
+    names = [name for name in current["scenarios"] if name in baseline["scenarios"]]
+    for name in (*names, "total"):
+        before = baseline["total"] if name == "total" else baseline["scenarios"][name]
+        after = current["total"] if name == "total" else current["scenarios"][name]
+        for metric in ("throughput_rps", *(f"p{p}_ms" for p in PERCENTILES)):
+            change = (after[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+            print(f"{name:<24} {metric:<15} {before[metric]:>10.2f} {after[metric]:>10.2f} {change:>+7.1f}%")
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument('baseline', help='Report of the reference run')
+    parser.add_argument('current', help='Report of the run to check')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = get_args()
+    with open(args.baseline) as b, open(args.current) as c:
+        compare(json.load(b), json.load(c))
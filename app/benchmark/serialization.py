@@ -0,0 +1,127 @@
+"""
+Per-request CPU of building an /items/filter page response: the previous
+Pydantic path (models per row, then FastAPI's response_model validation and
+jsonable_encoder) against the current plain-dict path encoded once by
+pydantic-core. Needs no database.
+
+    python -m benchmark.serialization --items 100 --reviews 50 --characteristics 20
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from lib.cache.backend import encode_response
+from models.app.response import (
+    ItemsPaginationResponse,
+    ItemResponse,
+    CategoryResponse,
+    Characteristic as CharacteristicResponse,
+    ReviewResponse
+)
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization.")
+    parser.add_argument('--items', type=int, help='Items per page', default=100)
+    parser.add_argument('--reviews', type=int, help='Reviews per item', default=50)
+    parser.add_argument('--characteristics', type=int, help='Characteristics per item', default=20)
+    parser.add_argument('--runs', type=int, help='Timed runs per variant', default=50)
+    return parser.parse_args()
+
+
+def make_page(args) -> list[tuple]:
+    random.seed(0)
+    now = datetime.now()
+    category = {"id": uuid4(), "name": "category", "description": "description"}
+    return [
+        (
+            {
+                "id": uuid4(),
+                "name": f"item-{n}",
+                "description": "description",
+                "price": random.uniform(1, 1000),
+                "reviews_count": args.reviews,
+                "rating_avg": 3.0,
+                "rating_histogram": [args.reviews // 5] * 5
+            },
+            category,
+            [{"id": uuid4(), "name": f"char-{c}", "value": str(c)} for c in range(args.characteristics)],
+            [
+                {
+                    "id": uuid4(),
+                    "name": f"review-{r}",
+                    "description": "text " * 20,
+                    "stars": random.randint(1, 5),
+                    "created_at": now - timedelta(minutes=r)
+                }
+                for r in range(args.reviews)
+            ]
+        )
+        for n in range(args.items)
+    ]
+
+
+_page_adapter = TypeAdapter(ItemsPaginationResponse)
+
+
+def pydantic_path(rows) -> bytes:
+    response = ItemsPaginationResponse(
+        page=1,
+        limit=len(rows),
+        count=len(rows),
+        items=[
+            ItemResponse(
+                **item,
+                category=CategoryResponse(**category),
+                characteristics=[CharacteristicResponse.model_validate(char) for char in characteristics],
+                reviews=[ReviewResponse.model_validate(review) for review in reviews]
+            )
+            for item, category, characteristics, reviews in rows
+        ]
+    )
+    # What FastAPI does with a returned model and response_model set
+    validated = _page_adapter.validate_python(response.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def dict_path(rows) -> bytes:
+    return encode_response({
+        "page": 1,
+        "limit": len(rows),
+        "count": len(rows),
+        "next_cursor": None,
+        "items": [
+            {**item, "category": category, "characteristics": characteristics, "reviews": reviews}
+            for item, category, characteristics, reviews in rows
+        ]
+    })
+
+
+def timed(runs: int, call, rows) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.process_time()
+        call(rows)
+        timings.append((time.process_time() - started) * 1000)
+    return timings
+
+
+def main(args):
+    rows = make_page(args)
+    pydantic_path(rows)
+    dict_path(rows)
+    for name, call in (("pydantic", pydantic_path), ("dict", dict_path)):
+        timings = timed(args.runs, call, rows)
+        print(f"{name:<10} median {statistics.median(timings):8.2f} ms CPU  min {min(timings):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -0,0 +1,76 @@
+"""
+Cold start profile of the app: import time per module (from `python -X importtime`)
+and SQLAlchemy mapper configuration time, measured in a fresh interpreter.
+Needs no database.
+
+    python -m benchmark.startup --top 25 --prefix routers --prefix lib --prefix models
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# Runs in the profiled interpreter; prints the mapper timing as the last stdout line
+_PROFILED = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+from sqlalchemy.orm import configure_mappers
+configure_mappers()
+print(json.dumps({"import_ms": (imported - started) * 1000, "configure_mappers_ms": (time.perf_counter() - imported) * 1000}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Rows of `-X importtime` output; a module's cumulative time includes the modules it imported."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+    return modules
+
+
+def profile() -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROFILED], capture_output=True, text=True, check=True
+    )
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {**timings, "modules": parse_importtime(completed.stderr)}
+
+
+def print_profile(result: dict, top: int, prefixes: list[str]):
+    modules = result["modules"]
+    if prefixes:
+        modules = [row for row in modules if row["module"].split(".")[0] in prefixes]
+    print(f"import app: {result['import_ms']:.1f} ms, configure_mappers: {result['configure_mappers_ms']:.1f} ms")
+    print(f"{'module':<50} {'self ms':>10} {'cumul ms':>10}")
+    for row in sorted(modules, key=lambda row: row["cumulative_ms"], reverse=True)[:top]:
+        print(f"{row['module']:<50} {row['self_ms']:>10.2f} {row['cumulative_ms']:>10.2f}")
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Profile module imports and mapper configuration at startup.")
+    parser.add_argument('--top', type=int, help='Modules to list, slowest cumulative first', default=30)
+    parser.add_argument('--prefix', action='append', help='Only list modules of this top-level package (repeatable)',
+                        default=[])
+    parser.add_argument('--output', help='Also save the full profile as JSON', default=None)
+    return parser.parse_args()
+
+
+def main(args):
+    result = profile()
+    print_profile(result, args.top, args.prefix)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -0,0 +1,151 @@
+import hashlib
+import time
+
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from pydantic_core import from_json, to_json
+
+from lib.cache.conditional import body_etag, is_not_modified, not_modified_response
+
+from lib.cache.memory import MemoryCache
+from lib.cache.redis_cache import RedisCache
+from lib.cache.singleflight import SingleFlight
+from lib.cache.ttl import TTLCache
+from lib.config import (
+    CACHE_BACKEND,
+    CACHE_URL,
+    CACHE_CHANNEL,
+    CACHE_SIZE,
+    CACHE_NEAR_TTL,
+    DB_REPLICA_STICKY_SECONDS,
+    FACETS_CACHE_TTL,
+    FACETS_CACHE_SIZE
+)
+from lib.db.engine import reads_replica, sticky_primary
+
+
+def request_key(scope: str, request: BaseModel) -> str:
+    digest = hashlib.sha1(request.model_dump_json().encode()).hexdigest()
+    return f"{scope}:{digest}"
+
+
+def _create_response_cache() -> MemoryCache | RedisCache:
+    if CACHE_BACKEND == "redis":
+        return RedisCache(CACHE_URL, CACHE_CHANNEL, CACHE_SIZE, CACHE_NEAR_TTL)
+    return MemoryCache(CACHE_SIZE)
+
+
+# Pre-encoded JSON bodies of detail and list responses
+response_cache = _create_response_cache()
+
+# Cache misses being built, keyed like the response cache
+response_flights = SingleFlight()
+
+# POST /items/facets results keyed by filter fingerprint
+facets_cache = TTLCache(FACETS_CACHE_TTL, FACETS_CACHE_SIZE)
+
+# Cache generation when the current request missed; the entry it builds is dropped if a delete moved it since
+_miss_generation: ContextVar[int | None] = ContextVar("cache_miss_generation", default=None)
+
+
+def _pack(headers: dict, body: bytes) -> bytes:
+    # Encoded JSON never contains a raw newline, so the first one ends the headers
+    return to_json(headers) + b"\n" + body
+
+
+def _unpack(value: bytes) -> tuple[dict, bytes]:
+    headers, separator, body = value.partition(b"\n")
+    if not separator:
+        return {}, value
+    return from_json(headers), body
+
+
+def bypasses_cache(request: Request | None) -> bool:
+    """Clients reading their own writes skip cached entries, which may predate the write."""
+    return sticky_primary(request)
+
+
+def may_cache(request: Request | None) -> bool:
+    """
+    Whether a response built for `request` may be stored.
+
+    Not when it was read from a replica within the stickiness window after an invalidation,
+    as the replica may not have the write yet and the stale entry would outlive the window.
+    """
+    return not (
+        reads_replica(request)
+        and time.monotonic() - response_cache.invalidated_at < DB_REPLICA_STICKY_SECONDS
+    )
+
+
+def _respond(value: bytes, request: Request | None) -> Response:
+    headers, body = _unpack(value)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def cached_response(key: str, request: Request | None = None) -> Response | None:
+    """
+    The cached response under `key`, or a 304 when it satisfies the conditional headers of `request`.
+
+    A miss records the cache generation before the route reads anything, for `store_entry` to check.
+    """
+    value = None if bypasses_cache(request) else await response_cache.get(key)
+    if value is None:
+        _miss_generation.set(await response_cache.generation())
+        return None
+    return _respond(value, request)
+
+
+def encode_response(response: BaseModel | dict) -> bytes:
+    """JSON-encodes a model, or a plain dict already in the response shape without validating it again."""
+    if isinstance(response, BaseModel):
+        return response.model_dump_json().encode()
+    return to_json(response)
+
+
+async def store_entry(
+        key: str,
+        response: BaseModel | dict,
+        ttl: float,
+        tags: Iterable[str] = (),
+        headers: dict | None = None,
+        request: Request | None = None) -> bytes:
+    """
+    Caches the encoded body with its validators and returns the entry; the ETag defaults to a hash of the body.
+
+    The entry is only returned, not stored, when `may_cache(request)` is false or when a delete
+    happened since this request missed the cache, as the response may have been read before the write.
+    """
+    body = encode_response(response)
+    value = _pack({"ETag": body_etag(body), **(headers or {})}, body)
+    if may_cache(request):
+        await response_cache.set(key, value, ttl, tags, generation=_miss_generation.get())
+    return value
+
+
+async def store_response(
+        key: str,
+        response: BaseModel | dict,
+        ttl: float,
+        tags: Iterable[str] = (),
+        headers: dict | None = None,
+        request: Request | None = None) -> Response:
+    """Caches like `store_entry` and answers `request` from the stored entry."""
+    return _respond(await store_entry(key, response, ttl, tags, headers, request), request)
+
+
+async def shared_response(key: str, request: Request | None, build: Callable[[], Awaitable[bytes]]) -> Response:
+    """
+    Response from the entry `build` stores under `key`, built once for all concurrent misses of the key.
+
+    Callers that share a build still get their own 304 evaluation. Clients reading their own
+    writes build alone, as a shared build may be reading a replica.
+    """
+    if bypasses_cache(request):
+        return _respond(await build(), request)
+    return _respond(await response_flights.do(key, build), request)
@@ -0,0 +1,64 @@
+import hashlib
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+
+def etag(*parts) -> str:
+    """Weak validator over `parts`; weak because equal versions may still be encoded differently."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    # Timestamps are stored without a zone and written by the database in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def version_headers(cache_control: str, *versions: datetime | None, variant: str = "") -> dict:
+    """ETag and Last-Modified of a row from its version timestamps, e.g. its updated_at and its newest review."""
+    versions = [version for version in versions if version is not None]
+    headers = {"ETag": etag(*versions, variant), "Cache-Control": cache_control}
+    if versions:
+        headers["Last-Modified"] = http_date(max(versions))
+    return headers
+
+
+def _opaque(tag: str) -> str:
+    return tag.strip().removeprefix("W/")
+
+
+def is_not_modified(request: Request | None, headers: dict) -> bool:
+    """RFC 9110 evaluation for GET and HEAD: If-None-Match wins, If-Modified-Since is used only without it."""
+    if request is None or request.method not in ("GET", "HEAD"):
+        return False
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        current = headers.get("ETag")
+        if current is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(current) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
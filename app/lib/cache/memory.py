@@ -0,0 +1,48 @@
+import time
+
+from typing import Iterable
+
+from lib.cache.ttl import TTLCache
+
+
+class MemoryCache:
+    """Per-process response cache. Invalidation only reaches the current worker."""
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache(ttl=0, maxsize=maxsize)
+        # monotonic time of the last delete
+        self.invalidated_at = float("-inf")
+        self._generation = 0
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        self._cache.clear()
+
+    async def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    async def generation(self) -> int:
+        """Moves with every delete; passed back to `set`, it drops a value built before a later delete."""
+        return self._generation
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = (), generation: int | None = None):
+        if generation is not None and generation != self._generation:
+            return
+        self._cache.set(key, value, tags=tags, ttl=ttl)
+
+    async def delete(self, *keys: str):
+        self.invalidated_at = time.monotonic()
+        self._generation += 1
+        for key in keys:
+            self._cache.delete(key)
+
+    async def delete_tags(self, *tags: str):
+        self.invalidated_at = time.monotonic()
+        self._generation += 1
+        for tag in tags:
+            self._cache.delete_tag(tag)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self._cache.stats()}
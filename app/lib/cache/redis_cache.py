@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+import time
+
+from typing import Iterable
+
+from lib.cache.ttl import TTLCache
+
+logger = logging.getLogger("app.cache")
+
+_TAG_PREFIX = "tag:"
+# Incremented by every delete, before the keys go
+_GENERATION_KEY = "cache:generation"
+
+
+class RedisCache:
+    """
+    Response cache shared by every replica through a Redis-protocol server.
+
+    Each process keeps a short-lived near cache in front of redis. Deletes are
+    published on `channel` so that every replica drops its near copy as well.
+    """
+
+    def __init__(self, url: str, channel: str, near_size: int, near_ttl: float, client=None):
+        if client is None:
+            from redis.asyncio import Redis
+            client = Redis.from_url(url)
+        self.client = client
+        self.channel = channel
+        self.near_ttl = near_ttl
+        self.hits = 0
+        self.misses = 0
+        self._near = TTLCache(ttl=near_ttl, maxsize=near_size)
+        # monotonic time of the last delete made or announced by any replica
+        self.invalidated_at = float("-inf")
+        self._listener: asyncio.Task | None = None
+
+    async def start(self):
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        await self.client.aclose()
+
+    async def get(self, key: str) -> bytes | None:
+        value = self._near.get(key)
+        if value is None:
+            value = await self.client.get(key)
+            if value is not None:
+                self._near.set(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def generation(self) -> int:
+        """Moves with every delete on any replica; passed back to `set`, it drops a value built before a later delete."""
+        return int(await self.client.get(_GENERATION_KEY) or 0)
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = (), generation: int | None = None):
+        from redis.exceptions import WatchError
+
+        expire_ms = max(int(ttl * 1000), 1)
+        async with self.client.pipeline(transaction=generation is not None) as pipe:
+            if generation is not None:
+                # The write fails if a delete moves the generation between this check and EXEC
+                await pipe.watch(_GENERATION_KEY)
+                if int(await pipe.get(_GENERATION_KEY) or 0) != generation:
+                    return
+                pipe.multi()
+            pipe.set(key, value, px=expire_ms)
+            for tag in tags:
+                pipe.sadd(_TAG_PREFIX + tag, key)
+                pipe.pexpire(_TAG_PREFIX + tag, expire_ms, nx=True)
+                pipe.pexpire(_TAG_PREFIX + tag, expire_ms, gt=True)
+            try:
+                await pipe.execute()
+            except WatchError:
+                return
+        self._near.set(key, value, ttl=min(ttl, self.near_ttl))
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        await self.client.incr(_GENERATION_KEY)
+        await self.client.delete(*keys)
+        await self._broadcast(keys)
+
+    async def delete_tags(self, *tags: str):
+        # Before reading the tags: a value stored earlier is in them, a later one fails its generation check
+        await self.client.incr(_GENERATION_KEY)
+        keys = set()
+        for tag in tags:
+            keys.update(
+                key.decode() if isinstance(key, bytes) else key
+                for key in await self.client.smembers(_TAG_PREFIX + tag)
+            )
+        await self.client.delete(*keys, *(_TAG_PREFIX + tag for tag in tags))
+        await self._broadcast(keys)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "near": self._near.stats()
+        }
+
+    async def _broadcast(self, keys: Iterable[str]):
+        keys = list(keys)
+        self.invalidated_at = time.monotonic()
+        for key in keys:
+            self._near.delete(key)
+        # Published even without keys, so other replicas still learn that a write happened
+        await self.client.publish(self.channel, json.dumps(keys))
+
+    async def _listen(self, pubsub):
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    keys = json.loads(message["data"])
+                except (TypeError, ValueError):
+                    logger.warning("Ignoring malformed invalidation message %r", message["data"])
+                    continue
+                self.invalidated_at = time.monotonic()
+                for key in keys:
+                    self._near.delete(key)
+        finally:
+            await pubsub.aclose()
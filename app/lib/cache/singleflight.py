@@ -0,0 +1,67 @@
+import asyncio
+
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from lib import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; callers arriving while it runs await it and share its result.
+
+    Failures are shared too. If the leading call is cancelled, a waiting caller takes over and runs it again.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._calls.get(key)) is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                continue
+            except Exception:
+                self._count_coalesced()
+                raise
+            self._count_coalesced()
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            self.failures += 1
+            future.set_exception(exc)
+            # Marks it retrieved, so a failure nobody waited for is not reported again on garbage collection
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def _count_coalesced(self):
+        self.coalesced += 1
+        metrics.requests_coalesced.inc(metrics.route_label(metrics.current_scope.get()))
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "failures": self.failures
+        }
@@ -0,0 +1,83 @@
+import time
+
+from collections import OrderedDict, defaultdict
+from typing import Any, Hashable, Iterable
+
+
+class TTLCache:
+    """
+    Bounded LRU mapping whose entries expire `ttl` seconds after being set.
+
+    No method awaits, so it is safe to share between coroutines on one event loop.
+    Entries may carry tags so that a write can evict every entry derived from a row.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any, tuple]] = OrderedDict()
+        self._tags: defaultdict[Hashable, set] = defaultdict(set)
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = (), ttl: float | None = None):
+        if key in self._data:
+            self._remove(key)
+        tags = tuple(tags)
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value, tags)
+        for tag in tags:
+            self._tags[tag].add(key)
+        while len(self._data) > self.maxsize:
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        if key in self._data:
+            self._remove(key)
+
+    def delete_tag(self, tag: Hashable) -> list[Hashable]:
+        keys = list(self._tags.get(tag, ()))
+        for key in keys:
+            self._remove(key)
+        return keys
+
+    def clear(self):
+        self._data.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _remove(self, key: Hashable):
+        _, _, tags = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
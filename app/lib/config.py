@@ -1,9 +1,88 @@
 import os
 
+
+def _bool_env(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "on")
+
+
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "app_db")
 DB_USER = os.getenv("DB_USER", "user")
 DB_PASS = os.getenv("DB_PASS", "password")
 
-DB_SCHEMA = os.getenv("DB_SCHEMA", "app")
\ No newline at end of file
+DB_SCHEMA = os.getenv("DB_SCHEMA", "app")
+
+DB_ECHO = _bool_env("DB_ECHO", "false")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _bool_env("DB_POOL_PRE_PING", "true")
+# Prepared statements cached per connection; 0 disables (e.g. behind pgbouncer in transaction mode)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+# Connections all server workers together may hold on one Postgres server; 0 leaves every pool at full size
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "0"))
+# Connections per engine opened at startup and primed with the hot statements; capped at the pool size, 0 disables
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "4"))
+# Server processes sharing the budget; main.py sets it for the workers it starts
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1")) or os.cpu_count() or 1
+
+# Optional streaming replica for reads; same credentials and database as the primary
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST", "")
+DB_REPLICA_PORT = os.getenv("DB_REPLICA_PORT", DB_PORT)
+# Reads go to the primary for this long after the same client wrote
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+
+COUNT_ESTIMATE_TTL = float(os.getenv("COUNT_ESTIMATE_TTL", "30"))
+# Exact counts reused by the cursor pages of one filter, which don't count in the page query
+COUNT_EXACT_TTL = float(os.getenv("COUNT_EXACT_TTL", "30"))
+
+FACETS_CACHE_TTL = float(os.getenv("FACETS_CACHE_TTL", "60"))
+FACETS_CACHE_SIZE = int(os.getenv("FACETS_CACHE_SIZE", "1024"))
+
+# "ilike", "trigram" (pg_trgm GIN) or "fulltext" (tsvector GIN)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "trigram")
+SEARCH_TS_CONFIG = os.getenv("SEARCH_TS_CONFIG", "simple")
+
+# "memory" (per process) or "redis" (shared between replicas)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_CHANNEL = os.getenv("CACHE_CHANNEL", "app:cache:invalidate")
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", "10000"))
+# Upper bound for the in-process copy kept in front of redis
+CACHE_NEAR_TTL = float(os.getenv("CACHE_NEAR_TTL", "5"))
+
+ITEM_DETAIL_CACHE_TTL = float(os.getenv("ITEM_DETAIL_CACHE_TTL", "30"))
+NEWS_DETAIL_CACHE_TTL = float(os.getenv("NEWS_DETAIL_CACHE_TTL", "30"))
+ITEMS_LIST_CACHE_TTL = float(os.getenv("ITEMS_LIST_CACHE_TTL", "5"))
+NEWS_LIST_CACHE_TTL = float(os.getenv("NEWS_LIST_CACHE_TTL", "5"))
+CORE_LIST_CACHE_TTL = float(os.getenv("CORE_LIST_CACHE_TTL", "30"))
+
+# Items per transaction in POST /items/bulk
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+# Rows fetched from the server-side cursor per chunk in POST /items/export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+# JSON access log written from a background thread; records are dropped once the queue is full
+ACCESS_LOG = _bool_env("ACCESS_LOG", "true")
+ACCESS_LOG_QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+
+# Statements slower than this are logged and kept for GET /admin/slow-queries; 0 disables
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Fraction of slow SELECTs re-run with EXPLAIN (ANALYZE, BUFFERS) on a separate connection
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", "100"))
+
+# Newest reviews embedded in item and news responses; the rest via GET /{items,news}/{id}/reviews
+EMBEDDED_REVIEWS_LIMIT = int(os.getenv("EMBEDDED_REVIEWS_LIMIT", "5"))
+REVIEWS_CACHE_TTL = float(os.getenv("REVIEWS_CACHE_TTL", "30"))
+
+# Cache-Control sent with each route's responses and 304s; ETag/Last-Modified make revalidation cheap
+CACHE_CONTROL_ITEM_DETAIL = os.getenv("CACHE_CONTROL_ITEM_DETAIL", "no-cache")
+CACHE_CONTROL_ITEMS_LIST = os.getenv("CACHE_CONTROL_ITEMS_LIST", "no-cache")
+CACHE_CONTROL_NEWS_DETAIL = os.getenv("CACHE_CONTROL_NEWS_DETAIL", "no-cache")
+CACHE_CONTROL_NEWS_LIST = os.getenv("CACHE_CONTROL_NEWS_LIST", "no-cache")
+CACHE_CONTROL_CORE_LIST = os.getenv("CACHE_CONTROL_CORE_LIST", "no-cache")
+CACHE_CONTROL_REVIEWS = os.getenv("CACHE_CONTROL_REVIEWS", "no-cache")
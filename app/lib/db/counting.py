@@ -0,0 +1,76 @@
+from typing import Literal
+
+from pydantic import BaseModel
+from sqlalchemy import func, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+
+from lib.cache.ttl import TTLCache
+from lib.config import COUNT_ESTIMATE_TTL, COUNT_EXACT_TTL
+from lib.db.explain import Explain, load_plan
+
+CountMode = Literal["exact", "estimate", "none"]
+
+# Request fields that change neither the matching rows nor their count
+_PAGINATION_FIELDS = {"page", "limit", "cursor", "count_mode", "sort_by", "sort_dir", "fields"}
+
+_estimates = TTLCache(COUNT_ESTIMATE_TTL)
+_totals = TTLCache(COUNT_EXACT_TTL)
+
+
+def count_column(mode: CountMode, id_column: ColumnElement, cursor: bool = False) -> ColumnElement:
+    """
+    Window count for `exact` mode, a free NULL placeholder otherwise so row shape stays the same.
+
+    Not with a cursor: the window would run after the seek, counting only the rows past it.
+    """
+    if mode == "exact" and not cursor:
+        return func.count(id_column).over().label("count")
+    return null().label("count")
+
+
+def filter_fingerprint(scope: str, request: BaseModel) -> str:
+    return f"{scope}:{request.model_dump_json(exclude=_PAGINATION_FIELDS)}"
+
+
+async def estimate_count(db: AsyncSession, source: Select, fingerprint: str) -> int:
+    cached = _estimates.get(fingerprint)
+    if cached is not None:
+        return cached
+
+    raw = (await db.execute(Explain(source))).scalar()
+    estimate = int(load_plan(raw)[0]["Plan"]["Plan Rows"])
+
+    _estimates.set(fingerprint, estimate)
+    return estimate
+
+
+async def exact_count(db: AsyncSession, source: Select, fingerprint: str) -> int:
+    cached = _totals.get(fingerprint)
+    if cached is not None:
+        return cached
+
+    total = (await db.execute(select(func.count()).select_from(source.subquery()))).scalar()
+
+    _totals.set(fingerprint, total)
+    return total
+
+
+async def resolve_count(
+        db: AsyncSession,
+        mode: CountMode,
+        window_count: int | None,
+        source: Select | None,
+        fingerprint: str,
+        cursor: str | None = None) -> int | None:
+    if mode == "exact":
+        if cursor:
+            return await exact_count(db, source, fingerprint)
+        if window_count is not None:
+            # The first page's count also serves the cursor pages that follow it
+            _totals.set(fingerprint, window_count)
+        return window_count or 0
+    if mode == "estimate":
+        return await estimate_count(db, source, fingerprint)
+    return None
+
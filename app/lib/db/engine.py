@@ -1,27 +1,162 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.sql import Executable
 
-from typing import Literal, Iterable
+import asyncio
 
-from lib.config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS
+from typing import Awaitable, Callable, Literal, Iterable
+
+from lib.config import (
+    DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS,
+    DB_ECHO,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_CONNECTION_BUDGET,
+    WEB_WORKERS,
+    DB_REPLICA_HOST,
+    DB_REPLICA_PORT,
+    DB_REPLICA_STICKY_SECONDS
+)
+from lib.db.pool import InstrumentedPool
+from lib.db.slow_queries import instrument_slow_queries
+from lib.metrics import instrument_engine
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+REPLICA_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_NAME}"
+    if DB_REPLICA_HOST else None
+)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Set on clients that just wrote so their reads stay on the primary
+STICKY_PRIMARY_COOKIE = "db_read_primary"
+
+# Created by `init_engine` in the app lifespan
+engine: AsyncEngine | None = None
+replica_engine: AsyncEngine | None = None
 SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False
+    autocommit=False, autoflush=False, class_=AsyncSession, expire_on_commit=False
+)
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, class_=AsyncSession, expire_on_commit=False
 )
 Base = declarative_base()
 
+def pool_limits(workers: int = WEB_WORKERS) -> tuple[int, int]:
+    """pool_size and max_overflow of one worker, shrunk so that all workers stay within DB_CONNECTION_BUDGET."""
+    if DB_CONNECTION_BUDGET <= 0:
+        return DB_POOL_SIZE, DB_MAX_OVERFLOW
+    share = max(DB_CONNECTION_BUDGET // workers, 1)
+    pool_size = min(DB_POOL_SIZE, share)
+    return pool_size, min(DB_MAX_OVERFLOW, share - pool_size)
+
+def create_engine(url: str = DATABASE_URL) -> AsyncEngine:
+    pool_size, max_overflow = pool_limits()
+    return create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=InstrumentedPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE
+        }
+    )
+
+def init_engine() -> AsyncEngine:
+    global engine, replica_engine
+    engine = create_engine()
+    instrument_engine(engine.sync_engine, "primary")
+    instrument_slow_queries(engine, "primary")
+    SessionLocal.configure(bind=engine)
+    if REPLICA_DATABASE_URL:
+        replica_engine = create_engine(REPLICA_DATABASE_URL)
+        instrument_engine(replica_engine.sync_engine, "replica")
+        instrument_slow_queries(replica_engine, "replica")
+    ReadSessionLocal.configure(bind=replica_engine or engine)
+    return engine
+
+async def dispose_engine():
+    global engine, replica_engine
+    if replica_engine is not None:
+        await replica_engine.dispose()
+        replica_engine = None
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+
+async def warm_pool(connections: int, prime: Callable[[AsyncSession], Awaitable[None]]) -> int:
+    """
+    Opens up to `connections` connections per engine at once and runs `prime` on each, so their prepared
+    statement caches already hold the hot queries; returns how many were opened.
+    """
+    opened = 0
+    for target in (engine, replica_engine):
+        if target is None:
+            continue
+        count = min(connections, target.pool.size())
+        # All are held open together, so the pool can't hand one connection out twice
+        results = await asyncio.gather(*(target.connect() for _ in range(count)), return_exceptions=True)
+        conns = [result for result in results if not isinstance(result, BaseException)]
+        try:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            for conn in conns:
+                async with AsyncSession(bind=conn) as session:
+                    await prime(session)
+        finally:
+            for conn in conns:
+                await conn.close()
+        opened += len(conns)
+    return opened
+
+def pool_stats() -> dict:
+    stats = {}
+    if engine is not None:
+        stats["primary"] = engine.pool.stats()
+    if replica_engine is not None:
+        stats["replica"] = replica_engine.pool.stats()
+    return stats
+
 async def get_db():
     async with SessionLocal() as session:
         yield session
 
+async def get_write_db(response: Response):
+    response.set_cookie(
+        STICKY_PRIMARY_COOKIE, "1", max_age=DB_REPLICA_STICKY_SECONDS, httponly=True, samesite="lax"
+    )
+    async with SessionLocal() as session:
+        yield session
+
+def sticky_primary(request: Request | None) -> bool:
+    """Whether a replica exists but `request` comes from a client that just wrote and must read its writes."""
+    return replica_engine is not None and request is not None and bool(request.cookies.get(STICKY_PRIMARY_COOKIE))
+
+def reads_replica(request: Request | None) -> bool:
+    return replica_engine is not None and request is not None and not sticky_primary(request)
+
+def read_session_factory(request: Request) -> sessionmaker:
+    return ReadSessionLocal if reads_replica(request) else SessionLocal
+
+async def get_read_db(request: Request):
+    async with read_session_factory(request)() as session:
+        yield session
+
 async def db_execute(
         db: AsyncSession, 
         statement: Executable, 
-        with_result: Literal["all", "one", "raw_all", "raw_one"] = None) -> Iterable[Base] | Base | None:
+        with_result: Literal["all", "one", "raw_all", "raw_one"] = None,
+        params: dict | None = None) -> Iterable[Base] | Base | None:
     results_map = {
         "all": lambda x: x.scalars().all(),
         "one": lambda x: x.scalar(),
@@ -29,7 +164,7 @@ async def db_execute(
         "raw_one": lambda x: x.fetchone()
     }
     try:
-        result = await db.execute(statement)
+        result = await db.execute(statement, params)
         await db.commit()
     except Exception as e:
         raise e
@@ -0,0 +1,22 @@
+import json
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.expression import ClauseElement
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Executable, options: str = "FORMAT JSON"):
+        self.statement = statement
+        self.options = options
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw):
+    return f"EXPLAIN ({element.options}) " + compiler.process(element.statement, **kw)
+
+
+def load_plan(raw: str | list) -> list[dict]:
+    return json.loads(raw) if isinstance(raw, str) else raw
@@ -0,0 +1,80 @@
+import base64
+import json
+
+from datetime import datetime
+from typing import Any, Literal
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Column, tuple_
+from sqlalchemy.sql import ColumnElement, Select
+
+# Python types of the keyset values per sort; sorts not listed are numeric
+_SORT_VALUE_TYPES = {
+    "name": (str,),
+    "created_at": (datetime,),
+    "updated_at": (datetime,)
+}
+
+
+def encode_cursor(sort_by: str, value: Any, id: UUID) -> str:
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps({"s": sort_by, "v": value, "id": str(id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> tuple[Any, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload["v"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        id = UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+    if payload.get("s") != sort_by:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cursor does not match sort order")
+
+    # A value the column can't compare with would fail in the database instead
+    if isinstance(value, bool) or not isinstance(value, _SORT_VALUE_TYPES.get(sort_by, (int, float))):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+    return value, id
+
+
+def keyset_seek(
+        sort_column: Column,
+        id_column: Column,
+        sort_dir: Literal["asc", "desc"],
+        value: Any,
+        id: Any) -> ColumnElement:
+    """Rows after (value, id) in (sort_column, id_column) order; the bounds may be bound parameters."""
+    key = tuple_(sort_column, id_column)
+    return key > tuple_(value, id) if sort_dir == "asc" else key < tuple_(value, id)
+
+
+def apply_keyset(
+        query: Select,
+        sort_column: Column,
+        id_column: Column,
+        sort_dir: Literal["asc", "desc"],
+        cursor: str | None,
+        sort_by: str) -> Select:
+    """Orders `query` by (sort_column, id_column) and seeks past `cursor` when given."""
+    if sort_dir == "asc":
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    else:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+
+    if cursor:
+        value, id = decode_cursor(cursor, sort_by)
+        query = query.where(keyset_seek(sort_column, id_column, sort_dir, value, id))
+
+    return query
+
+
+def page_offset(page: int, limit: int, cursor: str | None) -> int:
+    return 0 if cursor else (page - 1) * limit
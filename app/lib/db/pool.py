@@ -0,0 +1,52 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, waited: float):
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, max_overflow: int = 10, **kw):
+        super().__init__(*args, max_overflow=max_overflow, **kw)
+        self.max_overflow = max_overflow
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe(time.perf_counter() - started)
+        return connection
+
+    def stats(self) -> dict:
+        capacity = self.size() + self.max_overflow
+        checked_out = self.checkedout()
+        return {
+            "size": self.size(),
+            "max_overflow": self.max_overflow,
+            "checked_in": self.checkedin(),
+            "checked_out": checked_out,
+            "overflow": self.overflow(),
+            "saturation": checked_out / capacity if capacity > 0 else 0.0,
+            "checkouts": self.metrics.checkouts,
+            "timeouts": self.metrics.timeouts,
+            "wait_seconds_total": self.metrics.wait_seconds_total,
+            "wait_seconds_max": self.metrics.wait_seconds_max
+        }
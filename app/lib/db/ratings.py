@@ -0,0 +1,66 @@
+from sqlalchemy import Column, func, select, update
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+STARS = range(1, 6)
+
+
+def rating_increment(model, stars: int) -> dict[ColumnElement, ColumnElement]:
+    """SET clause folding one new review into the aggregates; evaluated against the locked row."""
+    return {
+        model.reviews_count: model.reviews_count + 1,
+        model.rating_avg: (model.rating_avg * model.reviews_count + stars) / (model.reviews_count + 1),
+        model.rating_histogram[stars]: model.rating_histogram[stars] + 1,
+        # A review is not an edit; keeps the `onupdate` default from bumping it
+        model.updated_at: model.updated_at
+    }
+
+
+def rating_response(row) -> dict:
+    return {
+        "reviews_count": row.reviews_count,
+        "rating_avg": row.rating_avg,
+        "rating_histogram": row.rating_histogram
+    }
+
+
+async def backfill_ratings(db: AsyncSession, model, review_fk: Column, review_stars: Column, batch_size: int) -> int:
+    """Recomputes the aggregates from the reviews table, `batch_size` rows per transaction. Returns rows updated."""
+    updated = 0
+    last_id = None
+    while True:
+        ids_query = select(model.id).order_by(model.id).limit(batch_size)
+        if last_id is not None:
+            ids_query = ids_query.where(model.id > last_id)
+        ids = (await db.execute(ids_query)).scalars().all()
+        if not ids:
+            return updated
+
+        # Outer join so rows without reviews are reset to zeros too
+        totals = select(
+            model.id,
+            func.count(review_fk).label("reviews_count"),
+            func.coalesce(func.avg(review_stars), 0).label("rating_avg"),
+            array([func.count(review_fk).filter(review_stars == stars) for stars in STARS]).label("rating_histogram")
+        ).outerjoin(
+            review_fk.table,
+            review_fk == model.id
+        ).where(
+            model.id.in_(ids)
+        ).group_by(
+            model.id
+        ).subquery()
+
+        await db.execute(
+            update(model).where(model.id == totals.c.id).values(
+                reviews_count=totals.c.reviews_count,
+                rating_avg=totals.c.rating_avg,
+                rating_histogram=totals.c.rating_histogram,
+                updated_at=model.updated_at
+            )
+        )
+        await db.commit()
+
+        updated += len(ids)
+        last_id = ids[-1]
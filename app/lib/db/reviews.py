@@ -0,0 +1,81 @@
+from sqlalchemy import Column, func, null, select, text
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from lib.db.engine import db_execute
+from lib.db.pagination import apply_keyset, encode_cursor
+
+
+def embedded_reviews(review: type, review_fk: Column, parent_id: ColumnElement, limit: int) -> ColumnElement:
+    """Newest `limit` reviews of `parent_id` as a jsonb array, read from the (parent, created_at) index; NULL for 0."""
+    if limit <= 0:
+        return null()
+
+    newest = select(
+        review.id,
+        review.name,
+        review.description,
+        review.stars,
+        review.created_at
+    ).where(
+        review_fk == parent_id
+    ).order_by(
+        review.created_at.desc(), review.id.desc()
+    ).limit(limit).correlate_except(review).subquery()
+
+    return select(
+        func.coalesce(
+            func.jsonb_agg(
+                aggregate_order_by(
+                    func.jsonb_build_object(
+                        "id", newest.c.id,
+                        "name", newest.c.name,
+                        "description", newest.c.description,
+                        "stars", newest.c.stars,
+                        "created_at", newest.c.created_at
+                    ),
+                    newest.c.created_at.desc(),
+                    newest.c.id.desc()
+                )
+            ),
+            text("'[]'::jsonb"),
+            type_=JSONB
+        )
+    ).scalar_subquery()
+
+
+def latest_review_at(review: type, review_fk: Column, parent_id: ColumnElement) -> ColumnElement:
+    """created_at of the newest review, one backward step on the (parent, created_at) index."""
+    return select(func.max(review.created_at)).where(review_fk == parent_id).scalar_subquery()
+
+
+async def reviews_page(
+        db: AsyncSession,
+        review: type,
+        review_fk: Column,
+        parent_id,
+        limit: int,
+        cursor: str | None) -> tuple[list[dict], str | None]:
+    """One page of a parent's reviews, newest first, and the cursor of the next page."""
+    query = select(
+        review.id,
+        review.name,
+        review.description,
+        review.stars,
+        review.created_at
+    ).where(
+        review_fk == parent_id
+    ).limit(limit + 1)
+    query = apply_keyset(query, review.created_at, review.id, "desc", cursor, "created_at")
+
+    rows = await db_execute(db, query, with_result="raw_all")
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("created_at", rows[-1].created_at, rows[-1].id)
+
+    return [
+        {"id": id, "name": name, "description": description, "stars": stars, "created_at": created_at}
+        for id, name, description, stars, created_at in rows
+    ], next_cursor
@@ -0,0 +1,69 @@
+from sqlalchemy import Column, func, literal, or_, text, true
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.sql.expression import BindParameter
+
+from lib.config import SEARCH_BACKEND, SEARCH_TS_CONFIG
+
+_TS_CONFIG = text(f"'{SEARCH_TS_CONFIG}'::regconfig")
+
+
+def _no_keywords(keywords: str | BindParameter | None) -> bool:
+    # A bound parameter stands for keywords supplied at execution time
+    return not isinstance(keywords, BindParameter) and not keywords
+
+
+def search_document(name: Column, description: Column) -> ColumnElement:
+    """tsvector over name and description; shared by queries and the GIN expression indexes."""
+    return func.to_tsvector(
+        _TS_CONFIG,
+        func.coalesce(name, text("''"))
+        .op("||")(text("' '"))
+        .op("||")(func.coalesce(description, text("''")))
+    )
+
+
+class IlikeSearch:
+    """Substring match without ranking; sequential scan unless trigram indexes exist."""
+
+    def filter(self, name: Column, description: Column, keywords: str | BindParameter) -> ColumnElement:
+        if _no_keywords(keywords):
+            return true()
+        return or_(name.icontains(keywords), description.icontains(keywords))
+
+    def relevance(self, name: Column, description: Column, keywords: str | BindParameter) -> ColumnElement:
+        return literal(0.0)
+
+
+class TrigramSearch(IlikeSearch):
+    """Substring match served by pg_trgm GIN indexes, ranked by word similarity."""
+
+    def relevance(self, name: Column, description: Column, keywords: str | BindParameter) -> ColumnElement:
+        if _no_keywords(keywords):
+            return literal(0.0)
+        return func.greatest(
+            func.word_similarity(keywords, name),
+            func.coalesce(func.word_similarity(keywords, description), 0.0)
+        )
+
+
+class FullTextSearch:
+    """Word match against the `search_document` GIN index, ranked by ts_rank."""
+
+    def filter(self, name: Column, description: Column, keywords: str | BindParameter) -> ColumnElement:
+        if _no_keywords(keywords):
+            return true()
+        return search_document(name, description).op("@@")(func.websearch_to_tsquery(_TS_CONFIG, keywords))
+
+    def relevance(self, name: Column, description: Column, keywords: str | BindParameter) -> ColumnElement:
+        if _no_keywords(keywords):
+            return literal(0.0)
+        return func.ts_rank(search_document(name, description), func.websearch_to_tsquery(_TS_CONFIG, keywords))
+
+
+_backends = {
+    "ilike": IlikeSearch,
+    "trigram": TrigramSearch,
+    "fulltext": FullTextSearch
+}
+
+search_backend: IlikeSearch | FullTextSearch = _backends[SEARCH_BACKEND]()
@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import time
+
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from lib.config import SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN_SAMPLE, SLOW_QUERY_BUFFER_SIZE
+from lib.db.explain import load_plan
+from lib.metrics import current_scope, route_label
+
+logger = logging.getLogger("app.db.slow")
+
+EXPLAIN_OPTIONS = "ANALYZE, BUFFERS, FORMAT JSON"
+# Execution option that keeps a statement out of the slow query log
+UNLOGGED = "slow_query_unlogged"
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+# Most recent slow statements, newest last; `plan` is filled in for the sampled ones
+slow_queries: deque[dict] = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
+
+_explains: set[asyncio.Task] = set()
+
+
+def fingerprint(statement: str) -> str:
+    """Stable id for a statement shape: literals and placeholders become `?`, IN lists collapse."""
+    normalized = _SPACES.sub(" ", _LISTS.sub("(?)", _LITERALS.sub("?", statement))).strip().lower()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def _is_explainable(statement: str, executemany: bool) -> bool:
+    # ANALYZE executes the statement, so only plain reads are re-run
+    return not executemany and statement.lstrip()[:6].upper() == "SELECT"
+
+
+async def _explain(engine: AsyncEngine, entry: dict, statement: str, parameters):
+    try:
+        async with engine.connect() as conn:
+            # The re-run is as slow as the original, it would be logged as a slow query of its own
+            raw = (await conn.exec_driver_sql(
+                f"EXPLAIN ({EXPLAIN_OPTIONS}) {statement}", parameters, execution_options={UNLOGGED: True}
+            )).scalar()
+            await conn.rollback()
+        entry["plan"] = load_plan(raw)
+    except Exception as e:
+        entry["plan_error"] = repr(e)
+        logger.warning("EXPLAIN of slow query %s failed: %r", entry["fingerprint"], e)
+
+
+def instrument_slow_queries(engine: AsyncEngine, name: str):
+    """Logs statements slower than SLOW_QUERY_MS and samples their plans; no-op when the threshold is 0."""
+    if SLOW_QUERY_MS <= 0:
+        return
+
+    threshold = SLOW_QUERY_MS / 1000
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._slow_query_started
+        if elapsed < threshold or context.execution_options.get(UNLOGGED):
+            return
+
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "engine": name,
+            "route": route_label(current_scope.get()),
+            "fingerprint": fingerprint(statement),
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": statement,
+            "parameters": repr(parameters),
+            "plan": None
+        }
+        slow_queries.append(entry)
+        logger.warning(
+            "Slow query %s (%.1f ms) on %s: %s; parameters: %s",
+            entry["fingerprint"], entry["duration_ms"], entry["route"], statement, entry["parameters"]
+        )
+
+        # One plan at a time, so a burst of slow queries can't take over the pool
+        if _explains or random.random() >= SLOW_QUERY_EXPLAIN_SAMPLE or not _is_explainable(statement, executemany):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(_explain(engine, entry, statement, parameters))
+        _explains.add(task)
+        task.add_done_callback(_explains.discard)
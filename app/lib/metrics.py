@@ -0,0 +1,153 @@
+import time
+
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from starlette.types import Scope
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Scope of the request being served, so statement timings can be attributed to its route
+current_scope: ContextVar[Scope | None] = ContextVar("current_scope", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Per-label-set bucket counters; observation is a bisect and two additions."""
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound if bound == "+Inf" else _number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._series: dict[tuple[str, ...], int] = {}
+
+    def inc(self, *labels: str):
+        self._series[labels] = self._series.get(labels, 0) + 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {_number(self.value)}"]
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"), REQUEST_BUCKETS
+)
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+requests_coalesced = Counter(
+    "http_requests_coalesced_total", "Requests served by another identical request's database work.", ("route",)
+)
+statement_duration = Histogram(
+    "db_statement_duration_seconds", "Database statement latency by route template and statement type.",
+    ("engine", "route", "operation"), STATEMENT_BUCKETS
+)
+
+
+def route_label(scope: Scope | None) -> str:
+    route = scope.get("route") if scope else None
+    return getattr(route, "path", None) or "unmatched"
+
+
+def instrument_engine(engine: Engine, name: str):
+    """Times every cursor execution on `engine` into `statement_duration`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # On the execution context, which is dropped with the statement even when it fails
+        context._statement_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._statement_started
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        statement_duration.observe(elapsed, name, route_label(current_scope.get()), operation)
+
+
+def _pool_lines(pools: dict) -> list[str]:
+    fields = {
+        "size": ("gauge", "Configured pool size."),
+        "checked_out": ("gauge", "Connections currently checked out."),
+        "checked_in": ("gauge", "Idle connections in the pool."),
+        "overflow": ("gauge", "Connections opened beyond the pool size."),
+        "saturation": ("gauge", "Checked out connections over pool capacity."),
+        "checkouts": ("counter", "Connection checkouts."),
+        "timeouts": ("counter", "Checkouts that timed out waiting for a connection."),
+        "wait_seconds_total": ("counter", "Total time spent waiting for a connection."),
+        "wait_seconds_max": ("gauge", "Longest wait for a connection.")
+    }
+    lines = []
+    for field, (kind, help) in fields.items():
+        name = f"db_pool_{field}" if kind == "gauge" or field.endswith("_total") else f"db_pool_{field}_total"
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for engine_name, stats in pools.items():
+            lines.append(f'{name}{{engine="{engine_name}"}} {_number(stats[field])}')
+    return lines
+
+
+def render(pools: dict) -> str:
+    lines = [
+        *request_duration.render(),
+        *requests_in_flight.render(),
+        *requests_coalesced.render(),
+        *statement_duration.render(),
+        *_pool_lines(pools)
+    ]
+    return "\n".join(lines) + "\n"
@@ -1,11 +1,104 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+import json
 import logging
+import queue
+import sys
+import time
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger = logging.getLogger("fastapi.middleware")
-        logger.info(f"Request: {request.method} {request.url}")
-        response = await call_next(request)
-        logger.info(f"Response: {response.status_code}")
-        return response
\ No newline at end of file
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from lib.config import ACCESS_LOG, ACCESS_LOG_QUEUE_SIZE
+
+access_logger = logging.getLogger("app.access")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "fields", {})
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueues records unformatted so the listener thread does the work; drops them when the queue is full."""
+
+    def __init__(self, queue: queue.Queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_access_log() -> QueueListener | None:
+    """Routes `app.access` through a bounded queue to a JSON stdout handler; returns the started listener."""
+    if not ACCESS_LOG:
+        access_logger.disabled = True
+        return None
+
+    records = queue.Queue(maxsize=ACCESS_LOG_QUEUE_SIZE)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    access_logger.handlers = [DroppingQueueHandler(records)]
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+
+    listener = QueueListener(records, output, respect_handler_level=False)
+    listener.start()
+    return listener
+
+
+class LoggingMiddleware:
+    """Pure ASGI access log: one structured record per HTTP request, emitted after the response is sent."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not access_logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter_ns()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            access_logger.info(
+                "request",
+                extra={"fields": {
+                    "method": scope["method"],
+                    "route": getattr(route, "path", None),
+                    "path": scope["path"],
+                    "status": status_code,
+                    "bytes": size,
+                    "duration_ms": (time.perf_counter_ns() - started) / 1e6
+                }}
+            )
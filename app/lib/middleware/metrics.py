@@ -0,0 +1,37 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from lib.metrics import current_scope, request_duration, requests_in_flight, route_label
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware feeding the request latency histogram and in-flight gauge."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = current_scope.set(scope)
+        requests_in_flight.value += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.value -= 1
+            current_scope.reset(token)
+            request_duration.observe(
+                time.perf_counter() - started, scope["method"], route_label(scope), str(status_code)
+            )
@@ -0,0 +1,15 @@
+import time
+
+from contextlib import contextmanager
+
+# Milliseconds spent in each lifespan startup phase of this worker, served at GET /admin/startup
+timings: dict[str, float] = {}
+
+
+@contextmanager
+def timed(phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = round((time.perf_counter() - started) * 1000, 3)
@@ -1,34 +1,55 @@
+import os
 import uvicorn
 import argparse
 
-from app import app
-
 def get_args():
     parser = argparse.ArgumentParser(description="Process some arguments.")
     parser.add_argument('-a', '--address', type=str, help='IP address to bind to', default='0.0.0.0')
     parser.add_argument('-p', '--port', type=int, help='Port number to bind to', default=8000)
-    parser.add_argument('--reload', action='store_true', help='Enable auto-reload for development', default=False)
+    parser.add_argument('--reload', action='store_true', help='Enable auto-reload for development (single worker)', default=False)
+
+    parser.add_argument('-w', '--workers', type=int, help='Server processes; 0 starts one per CPU',
+                        default=int(os.getenv("WEB_WORKERS", "0")))
+    parser.add_argument('--loop', choices=['auto', 'uvloop', 'asyncio'], help='Event loop; auto prefers uvloop',
+                        default=os.getenv("WEB_LOOP", "auto"))
+    parser.add_argument('--http', choices=['auto', 'httptools', 'h11'], help='HTTP parser; auto prefers httptools',
+                        default=os.getenv("WEB_HTTP", "auto"))
+    parser.add_argument('--keep-alive', type=int, help='Seconds an idle keep-alive connection stays open',
+                        default=int(os.getenv("WEB_KEEP_ALIVE", "5")))
+    parser.add_argument('--backlog', type=int, help='Pending connections queued by the socket',
+                        default=int(os.getenv("WEB_BACKLOG", "2048")))
+    parser.add_argument('--limit-concurrency', type=int, help='Connections per worker before answering 503; 0 for no limit',
+                        default=int(os.getenv("WEB_LIMIT_CONCURRENCY", "0")))
+    parser.add_argument('--graceful-timeout', type=int, help='Seconds to drain in-flight requests on SIGTERM',
+                        default=int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30")))
 
     parser.add_argument('-l', '--log_level', type=str, choices=['debug', 'info', 'warning', 'error'], help='Logging level', default='info')
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    args.workers = 1 if args.reload else args.workers or os.cpu_count() or 1
+
+    budget = int(os.getenv("DB_CONNECTION_BUDGET", "0"))
+    if budget and budget < args.workers:
+        parser.error(f"DB_CONNECTION_BUDGET={budget} leaves no connection for some of the {args.workers} workers")
+    return args
 
 if __name__ == "__main__":
     args = get_args()
 
-    async def startup_event():
-        print("Startup")
-
-    async def shutdown_event():
-        print("Shutdown")
-    
-    app.add_event_handler("startup", startup_event)
-    app.add_event_handler("shutdown", shutdown_event)
+    # Read by lib.config in every worker, so each sizes its pool to its share of DB_CONNECTION_BUDGET
+    os.environ["WEB_WORKERS"] = str(args.workers)
 
     uvicorn.run(
-        "main:app",
+        "app:app",
         host=args.address,
         port=args.port,
         reload=args.reload,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_keep_alive=args.keep_alive,
+        backlog=args.backlog,
+        limit_concurrency=args.limit_concurrency or None,
+        timeout_graceful_shutdown=args.graceful_timeout,
         log_level=args.log_level
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,40 @@
+"""
+Recomputes reviews_count, rating_avg and rating_histogram on items and news
+from the reviews table. Run after loading reviews outside the API or to
+repair drift.
+
+    python -m maintenance.backfill_ratings --batch-size 1000
+"""
+import argparse
+import asyncio
+import time
+
+from lib.db.engine import SessionLocal, init_engine, dispose_engine
+from lib.db.ratings import backfill_ratings
+from models.db import Item, News, Review
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Backfill review aggregates on items and news.")
+    parser.add_argument('--batch-size', type=int, help='Rows updated per transaction', default=1000)
+    parser.add_argument('--only', choices=["items", "news"], help='Backfill one table only', default=None)
+    return parser.parse_args()
+
+
+async def main(args):
+    targets = {"items": (Item, Review.item_id), "news": (News, Review.news_id)}
+    init_engine()
+    try:
+        async with SessionLocal() as session:
+            for name, (model, review_fk) in targets.items():
+                if args.only and args.only != name:
+                    continue
+                started = time.perf_counter()
+                updated = await backfill_ratings(session, model, review_fk, Review.stars, args.batch_size)
+                print(f"{name:<6} {updated} rows in {time.perf_counter() - started:.1f} s")
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(get_args()))
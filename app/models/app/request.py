@@ -2,10 +2,19 @@ from pydantic import BaseModel, Field, UUID4
 from typing import List, Optional, Literal
 from uuid import uuid4
 
+ItemField = Literal["name", "description", "price", "category", "characteristics", "rating", "reviews"]
+NewsField = Literal["name", "description", "created_at", "updated_at", "rating", "reviews"]
+
 class PaginationRequest(BaseModel):
     page: int = Field(default=1, ge=1)
     limit: int = Field(default=10, ge=1)
     keywords: Optional[str] = Field(default="", max_length=64)
+    cursor: Optional[str] = Field(default=None, max_length=512, description="Opaque cursor from `next_cursor`, replaces `page`")
+    count_mode: Literal["exact", "estimate", "none"] = Field(default="exact", description="How `count` is computed")
+
+class ReviewsPageRequest(BaseModel):
+    limit: int = Field(default=20, ge=1, le=100)
+    cursor: Optional[str] = Field(default=None, max_length=512, description="Opaque cursor from `next_cursor`")
 
 class CharacteristicRequest(BaseModel):
     id: UUID4 = Field(default_factory=uuid4)
@@ -23,9 +32,20 @@ class ItemFilterRequest(PaginationRequest):
         description="List of characteristics with char_id and char_value"
     )
     sort_dir: Literal["asc", "desc"] = Field(default="asc")
-    sort_by: Literal["name", "created_at", "updated_at", "price"] = Field(default="price")
+    sort_by: Literal["name", "created_at", "updated_at", "price", "relevance", "rating"] = Field(
+        default="price",
+        description="`relevance` ranks by `keywords`, `rating` by average stars; combine with sort_dir=desc for best first"
+    )
     min_price: Optional[int | None] = Field(gt=0, default=0)
     max_price: Optional[int | None] = Field(gt=0, default=0)
+    min_rating: Optional[float] = Field(default=0, ge=0, le=5, description="Minimum average stars")
+    fields: Optional[List[ItemField]] = Field(
+        default=None,
+        description="Fields to return besides `id`; all when omitted. Unrequested relations are not joined"
+    )
+
+class NewsListRequest(PaginationRequest):
+    fields: Optional[List[NewsField]] = Field(default=None, description="Fields to return besides `id`; all when omitted")
 
 class ItemUpsertRequest(BaseModel):
     id: Optional[UUID4] = Field(default_factory=uuid4)
@@ -34,7 +54,7 @@ class ItemUpsertRequest(BaseModel):
     price: Optional[float | int] = Field(gt=0, default=0)
     category: Optional[UUID4] = Field(default_factory=uuid4, description="Category id [UUID]")
     characteristics: Optional[List[CharacteristicRequest]] = Field(
-        default=CharacteristicRequest, 
+        default_factory=list, 
         description="List of characteristics with char_id and char_value"
     )
 
@@ -1,11 +1,12 @@
 from pydantic import BaseModel, UUID4
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 class PaginationResponse(BaseModel):
     page: int
     limit: int
-    count: int
+    count: Optional[int]
+    next_cursor: Optional[str] = None
 
 class Characteristic(BaseModel):
     id: UUID4
@@ -19,27 +20,40 @@ class ReviewResponse(BaseModel):
     stars: int
     created_at: datetime
 
+class ReviewsPaginationResponse(BaseModel):
+    limit: int
+    count: int
+    next_cursor: Optional[str] = None
+    items: List[ReviewResponse]
+
 class CategoryResponse(BaseModel):
     id: UUID4
     name: str
     description: str
 
+# Fields other than `id` are left out when not requested with `fields`
 class ItemResponse(BaseModel):
     id: UUID4
-    name: str
-    description: str
-    price: float
-    category: CategoryResponse
-    characteristics: List[Characteristic|None]
-    reviews: List[ReviewResponse| None]
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    category: Optional[CategoryResponse] = None
+    characteristics: Optional[List[Characteristic|None]] = None
+    reviews_count: Optional[int] = None
+    rating_avg: Optional[float] = None
+    rating_histogram: Optional[List[int]] = None
+    reviews: Optional[List[ReviewResponse| None]] = None
 
 class NewsResponse(BaseModel):
     id: UUID4
-    name: str
-    description: str
-    created_at: datetime
-    updated_at: datetime
-    reviews: List[ReviewResponse|None]
+    name: Optional[str] = None
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    reviews_count: Optional[int] = None
+    rating_avg: Optional[float] = None
+    rating_histogram: Optional[List[int]] = None
+    reviews: Optional[List[ReviewResponse|None]] = None
 
 
 class CoreResponse(BaseModel):
@@ -57,4 +71,31 @@ class ItemsPaginationResponse(PaginationResponse):
     items: List[ItemResponse]
 
 class NewsPaginationResponse(PaginationResponse):
-    items: List[NewsResponse]
\ No newline at end of file
+    items: List[NewsResponse]
+
+class CategoryFacet(BaseModel):
+    id: UUID4
+    count: int
+
+class CharacteristicFacet(BaseModel):
+    id: UUID4
+    value: str
+    count: int
+
+class ItemFacetsResponse(BaseModel):
+    categories: List[CategoryFacet]
+    characteristics: List[CharacteristicFacet]
+
+class BulkBatchReport(BaseModel):
+    batch: int
+    items: int
+    characteristics_upserted: int
+    characteristics_deleted: int
+    seconds: float
+
+class BulkUpsertResponse(BaseModel):
+    items: int
+    characteristics_upserted: int
+    characteristics_deleted: int
+    seconds: float
+    batches: List[BulkBatchReport]
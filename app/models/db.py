@@ -1,13 +1,31 @@
-from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, DateTime, func, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, DateTime, func, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 
 from lib.db.engine import Base
+from lib.db.search import search_document
 from lib.config import DB_SCHEMA
 
+
+def keyset_indexes(table: str, *columns: str) -> tuple[Index, ...]:
+    """(column, id) btree indexes, so cursor pages seek by index range instead of sorting the table."""
+    return tuple(Index(f"ix_{table}_{column}_id", column, "id") for column in columns)
+
+
+def trigram_indexes(table: str) -> tuple[Index, Index]:
+    return tuple(
+        Index(f"ix_{table}_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+        for column in ("name", "description")
+    )
+
+
 class Category(Base):
     __tablename__ = "categories"
-    __table_args__ = {"schema": DB_SCHEMA}
+    __table_args__ = (
+        *trigram_indexes("categories"),
+        *keyset_indexes("categories", "name"),
+        {"schema": DB_SCHEMA}
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.uuid_generate_v4())
     name = Column(String(255), nullable=False, unique=False)
@@ -18,7 +36,11 @@ class Category(Base):
 
 class Characteristic(Base):
     __tablename__ = "characteristics"
-    __table_args__ = {"schema": DB_SCHEMA}
+    __table_args__ = (
+        *trigram_indexes("characteristics"),
+        *keyset_indexes("characteristics", "name"),
+        {"schema": DB_SCHEMA}
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.uuid_generate_v4())
     name = Column(String(255), nullable=False, unique=False)
@@ -29,13 +51,21 @@ class Characteristic(Base):
 
 class Item(Base):
     __tablename__ = "items"
-    __table_args__ = {"schema": DB_SCHEMA}
+    __table_args__ = (
+        *trigram_indexes("items"),
+        *keyset_indexes("items", "rating_avg", "price", "name", "created_at", "updated_at"),
+        {"schema": DB_SCHEMA}
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.uuid_generate_v4())
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=False)
     category_id = Column(UUID(as_uuid=True), ForeignKey("app.categories.id"), nullable=False)
+    reviews_count = Column(Integer, nullable=False, server_default="0")
+    rating_avg = Column(Float, nullable=False, server_default="0")
+    # rating_histogram[n] counts n-star reviews
+    rating_histogram = Column(ARRAY(Integer), nullable=False, server_default="{0,0,0,0,0}")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
@@ -48,6 +78,7 @@ class ItemCharacteristic(Base):
     __tablename__ = "item_characteristics"
     __table_args__ = (
         UniqueConstraint("item_id", "characteristic_id"),
+        Index("ix_item_characteristics_characteristic_value_item", "characteristic_id", "value", "item_id"),
         {"schema": DB_SCHEMA}
     )
 
@@ -62,7 +93,11 @@ class ItemCharacteristic(Base):
 
 class Review(Base):
     __tablename__ = "reviews"
-    __table_args__ = {"schema": DB_SCHEMA}
+    __table_args__ = (
+        Index("ix_reviews_item_id_created_at_id", "item_id", "created_at", "id"),
+        Index("ix_reviews_news_id_created_at_id", "news_id", "created_at", "id"),
+        {"schema": DB_SCHEMA}
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.uuid_generate_v4())
     item_id = Column(UUID(as_uuid=True), ForeignKey("app.items.id"), nullable=True)
@@ -78,12 +113,24 @@ class Review(Base):
 
 class News(Base):
     __tablename__ = "news"
-    __table_args__ = {"schema": DB_SCHEMA}
+    __table_args__ = (
+        *trigram_indexes("news"),
+        *keyset_indexes("news", "updated_at"),
+        {"schema": DB_SCHEMA}
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.uuid_generate_v4())
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
+    reviews_count = Column(Integer, nullable=False, server_default="0")
+    rating_avg = Column(Float, nullable=False, server_default="0")
+    # rating_histogram[n] counts n-star reviews
+    rating_histogram = Column(ARRAY(Integer), nullable=False, server_default="{0,0,0,0,0}")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     reviews = relationship("Review", back_populates="news")
+
+
+Index("ix_items_search_document", search_document(Item.name, Item.description), postgresql_using="gin")
+Index("ix_news_search_document", search_document(News.name, News.description), postgresql_using="gin")
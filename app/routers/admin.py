@@ -0,0 +1,28 @@
+from fastapi import APIRouter, status
+
+from lib.cache.backend import response_cache, response_flights, facets_cache
+from lib.db.engine import pool_stats
+from lib.db.slow_queries import slow_queries
+from lib.startup import timings
+
+router = APIRouter()
+
+@router.get("/cache", status_code=status.HTTP_200_OK, description="Hit/miss/eviction counters of the response caches and coalesced misses")
+async def cache_stats():
+    return {
+        "responses": response_cache.stats(),
+        "coalescing": response_flights.stats(),
+        "facets": facets_cache.stats()
+    }
+
+@router.get("/pool", status_code=status.HTTP_200_OK, description="Connection pool usage and checkout wait time")
+async def db_pool_stats():
+    return pool_stats()
+
+@router.get("/slow-queries", status_code=status.HTTP_200_OK, description="Recent statements over SLOW_QUERY_MS, newest first, with sampled EXPLAIN ANALYZE plans")
+async def slow_query_log():
+    return list(reversed(slow_queries))
+
+@router.get("/startup", status_code=status.HTTP_200_OK, description="Milliseconds spent in each startup phase of this worker")
+async def startup_timings():
+    return timings
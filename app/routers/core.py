@@ -1,18 +1,23 @@
 from uuid import UUID
-from fastapi import APIRouter, Query, Path, Body, status, Depends, HTTPException
+from fastapi import APIRouter, Query, Path, Body, status, Depends, HTTPException, Request
 from typing import Literal
 from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import delete, select, func, or_
+from sqlalchemy import delete, func, select, update
 
 from models.app.request import PaginationRequest, CoreUpsertRequest
 from models.app.response import CorePaginationResponse, CoreResponse
 
-from models.db import Category, Characteristic
+from models.db import Category, Characteristic, Item, ItemCharacteristic
 
-from lib.db.engine import get_db, db_execute
+from lib.db.engine import get_read_db, get_write_db, db_execute
+from lib.db.pagination import apply_keyset, encode_cursor, page_offset
+from lib.db.counting import count_column, filter_fingerprint, resolve_count
+from lib.db.search import search_backend
+from lib.cache.backend import response_cache, request_key, cached_response, store_entry, shared_response
+from lib.config import CORE_LIST_CACHE_TTL, CACHE_CONTROL_CORE_LIST
 
 router = APIRouter()
 
@@ -21,45 +26,76 @@ _parameters_map_to_model = {
     "characteristic": Characteristic
 }
 
-@router.get("/{parameter}/list", response_model=CorePaginationResponse, status_code=status.HTTP_200_OK)
-async def list_items(
-    parameter: Literal["category", "characteristic"] = Path(),
-    request: PaginationRequest = Query(default=PaginationRequest()),
-    db: AsyncSession = Depends(get_db)
-    ):
-    
+def _touch_items(parameter: Literal["category", "characteristic"], id):
+    """Moves updated_at, and so the ETag, of the items that embed the category or characteristic `id`."""
+    if parameter == "category":
+        affected = Item.category_id == id
+    else:
+        affected = Item.id.in_(select(ItemCharacteristic.item_id).where(ItemCharacteristic.characteristic_id == id))
+    return update(Item).where(affected).values(updated_at=func.now())
+
+async def _list_entry(
+        parameter: Literal["category", "characteristic"],
+        request: PaginationRequest,
+        db: AsyncSession,
+        cache_key: str,
+        http_request: Request | None) -> bytes:
     model: Category | Characteristic = _parameters_map_to_model[parameter]
-    offset = (request.page - 1) * request.limit
+    offset = page_offset(request.page, request.limit, request.cursor)
     
+    keywords_filter = search_backend.filter(model.name, model.description, request.keywords)
     query = select(model).add_columns(
-        func.count(model.id).over().label("count")
+        count_column(request.count_mode, model.id, bool(request.cursor))
     ).where(
-        or_(
-            model.name.icontains(request.keywords),
-            model.description.icontains(request.keywords)
-        )
-    ).order_by(
-        model.name.desc()
-    ).group_by(model.name, model.id).limit(request.limit).offset(offset)
+        keywords_filter
+    ).limit(request.limit + 1).offset(offset)
+    query = apply_keyset(query, model.name, model.id, "desc", request.cursor, "name")
 
     items: list[Category | Characteristic] = await db_execute(db, query, with_result="raw_all")
-    count = 0
+    window_count = None
     if items:
-        _, count = items[0]
-    
+        _, window_count = items[0]
+    count = await resolve_count(
+        db, request.count_mode, window_count, select(model.id).where(keywords_filter), filter_fingerprint(parameter, request),
+        request.cursor
+    )
 
-    return CorePaginationResponse(
+    next_cursor = None
+    if len(items) > request.limit:
+        items = items[:request.limit]
+        last_item, _ = items[-1]
+        next_cursor = encode_cursor("name", last_item.name, last_item.id)
+
+    response = CorePaginationResponse(
         page=request.page,
         limit=request.limit,
         count=count,
+        next_cursor=next_cursor,
         items = [CoreResponse.model_validate(item) for item, _ in items]
     )
+    return await store_entry(
+        cache_key, response, CORE_LIST_CACHE_TTL, tags=[f"{parameter}:list"], headers={"Cache-Control": CACHE_CONTROL_CORE_LIST},
+        request=http_request
+    )
+
+@router.get("/{parameter}/list", response_model=CorePaginationResponse, status_code=status.HTTP_200_OK)
+async def list_items(
+    parameter: Literal["category", "characteristic"] = Path(),
+    request: PaginationRequest = Query(default=PaginationRequest()),
+    db: AsyncSession = Depends(get_read_db),
+    http_request: Request = None
+    ):
+    cache_key = request_key(f"{parameter}:list", request)
+    if cached := await cached_response(cache_key, http_request):
+        return cached
+
+    return await shared_response(cache_key, http_request, lambda: _list_entry(parameter, request, db, cache_key, http_request))
 
 @router.patch("/{parameter}/", status_code=status.HTTP_204_NO_CONTENT)
 async def upsert_item(
     parameter: Literal["category", "characteristic"] = Path(),
     request: CoreUpsertRequest = Body(default_factory=CoreUpsertRequest),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
     ):
     model: Category | Characteristic = _parameters_map_to_model[parameter]
 
@@ -68,8 +104,7 @@ async def upsert_item(
             raise HTTPException(status.HTTP_400_BAD_REQUEST, "Name already exists")
         request.id = str(uuid4())
     
-    await db_execute(
-        db,
+    await db.execute(
         insert(model).values(
             id=request.id,
             name=request.name,
@@ -83,6 +118,9 @@ async def upsert_item(
             where=(model.id == request.id)
         )
     )
+    await db.execute(_touch_items(parameter, request.id))
+    await db.commit()
+    await response_cache.delete_tags(f"{parameter}:{request.id}", f"{parameter}:list", "items:list")
 
     return 
 
@@ -90,9 +128,12 @@ async def upsert_item(
 async def delete_item(
     parameter: Literal["category", "characteristic"] = Path(),
     id: UUID = Path(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
     ):
     model: Category | Characteristic = _parameters_map_to_model[parameter]
     
-    return await db_execute(db, delete(model).where(model.id == id))
+    await db.execute(_touch_items(parameter, id))
+    await db.execute(delete(model).where(model.id == id))
+    await db.commit()
+    await response_cache.delete_tags(f"{parameter}:{id}", f"{parameter}:list", "items:list")
 
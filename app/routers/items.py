@@ -1,253 +1,751 @@
-from fastapi import APIRouter, Body, Path, status, Depends, HTTPException
+from fastapi import APIRouter, Body, Path, Query, status, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
+import csv
+import io
+import json
+import time
 from uuid import uuid4, UUID
+from collections import defaultdict
+from functools import lru_cache
+from typing import AsyncIterator, Literal, NamedTuple, get_args
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import select, delete, or_, asc, desc, func, and_
+from sqlalchemy.dialects.postgresql import insert, ARRAY
+from sqlalchemy import select, update, delete, intersect, func, tuple_, bindparam, any_, text, Integer, String
+from sqlalchemy.sql.expression import BindParameter
 
-from models.app.request import ItemFilterRequest, ItemUpsertRequest, ReviewRequest
+from models.app.request import (
+    ItemFilterRequest,
+    ItemUpsertRequest,
+    ReviewRequest,
+    ReviewsPageRequest,
+    CharacteristicRequest,
+    ItemField
+)
 from models.app.response import (
     ItemsPaginationResponse, 
     ItemResponse, 
-    CategoryResponse, 
-    Characteristic as CharacteristicResponse,
-    ReviewResponse
+    ItemFacetsResponse,
+    CategoryFacet,
+    CharacteristicFacet,
+    BulkBatchReport,
+    BulkUpsertResponse,
+    ReviewsPaginationResponse
 )
 
 from models.db import Item, Characteristic, Category, ItemCharacteristic, Review
-from lib.db.engine import get_db, db_execute
+from lib.db.engine import get_read_db, get_write_db, db_execute, read_session_factory
+from lib.db.pagination import apply_keyset, decode_cursor, encode_cursor, keyset_seek, page_offset
+from lib.db.counting import count_column, filter_fingerprint, resolve_count
+from lib.db.search import search_backend
+from lib.db.ratings import rating_increment, rating_response
+from lib.db.reviews import embedded_reviews, latest_review_at, reviews_page
+from lib.cache.backend import (
+    response_cache,
+    response_flights,
+    facets_cache,
+    bypasses_cache,
+    may_cache,
+    request_key,
+    cached_response,
+    store_entry,
+    store_response,
+    shared_response
+)
+from lib.cache.conditional import version_headers, is_not_modified, not_modified_response
+from lib.config import (
+    ITEM_DETAIL_CACHE_TTL,
+    ITEMS_LIST_CACHE_TTL,
+    REVIEWS_CACHE_TTL,
+    EMBEDDED_REVIEWS_LIMIT,
+    BULK_BATCH_SIZE,
+    EXPORT_BATCH_SIZE,
+    CACHE_CONTROL_ITEM_DETAIL,
+    CACHE_CONTROL_ITEMS_LIST,
+    CACHE_CONTROL_REVIEWS
+)
 
 router = APIRouter()
 
-@router.post("/filter", response_model=ItemsPaginationResponse)
-async def filter_items(
-    request: ItemFilterRequest=Body(default=ItemFilterRequest()),
-    db: AsyncSession = Depends(get_db)
-    ):
-    sort_dir_map = {
-        "asc": asc,
-        "desc": desc
-    }
-    offset = (request.page - 1) * request.limit
+_bulk_items_adapter = TypeAdapter(list[ItemUpsertRequest])
+
+async def _load_characteristics(db: AsyncSession, item_ids: list[UUID]) -> dict[UUID, list[dict]]:
+    # The ids go in one array parameter, so every page size shares one statement (IN renders one per length)
+    result = defaultdict(list)
+    if not item_ids:
+        return result
+
+    query = select(
+        ItemCharacteristic.item_id,
+        Characteristic.id,
+        Characteristic.name,
+        ItemCharacteristic.value
+    ).join(
+        Characteristic,
+        Characteristic.id == ItemCharacteristic.characteristic_id
+    ).where(
+        ItemCharacteristic.item_id == any_(bindparam("item_ids", item_ids, type_=ARRAY(ItemCharacteristic.item_id.type)))
+    )
+
+    for item_id, id, name, value in await db_execute(db, query, with_result="raw_all"):
+        result[item_id].append({"id": id, "name": name, "value": value})
+    return result
+
+async def _load_reviews(db: AsyncSession, item_ids: list[UUID]) -> dict[UUID, list[dict]]:
+    """The newest EMBEDDED_REVIEWS_LIMIT reviews per item; the full list is paged by GET /items/{id}/reviews."""
+    result = defaultdict(list)
+    if not item_ids or EMBEDDED_REVIEWS_LIMIT <= 0:
+        return result
+
+    query = select(
+        Item.id,
+        embedded_reviews(Review, Review.item_id, Item.id, EMBEDDED_REVIEWS_LIMIT)
+    ).where(
+        Item.id == any_(bindparam("item_ids", item_ids, type_=ARRAY(Item.id.type)))
+    )
+
+    for item_id, reviews in await db_execute(db, query, with_result="raw_all"):
+        result[item_id] = reviews
+    return result
+
+def _characteristic_pairs(characteristics: list[CharacteristicRequest]) -> list[tuple[UUID, str]]:
+    return sorted({(characteristic.id, characteristic.value) for characteristic in characteristics})
+
+def _characteristics_filter(pairs: list[tuple]):
+    """Ids of items having every (characteristic, value) pair; the pairs may be bound parameters."""
+    selects = [
+        select(ItemCharacteristic.item_id).where(
+            ItemCharacteristic.characteristic_id == id,
+            ItemCharacteristic.value == value
+        )
+        for id, value in pairs
+    ]
+    return selects[0] if len(selects) == 1 else intersect(*selects)
+
+def _item_filter_opts(request: ItemFilterRequest) -> list:
     where_opts = []
-    
+
     if request.category:
         where_opts.append(Item.category_id == request.category)
     if request.min_price:
         where_opts.append(Item.price >= request.min_price)
     if request.max_price:
         where_opts.append(Item.price <= request.max_price)
+    if request.min_rating:
+        where_opts.append(Item.rating_avg >= request.min_rating)
     if request.characteristics:
-        for characteristic in request.characteristics:
-            where_opts.append(and_(ItemCharacteristic.value == characteristic.value, ItemCharacteristic.characteristic_id == characteristic.id))
+        where_opts.append(Item.id.in_(_characteristics_filter(_characteristic_pairs(request.characteristics))))
     if request.keywords:
-        where_opts.append(
-            or_(
-                Item.name.icontains(request.keywords),
-                Item.description.icontains(request.keywords)
-            )
-        )
+        where_opts.append(search_backend.filter(Item.name, Item.description, request.keywords))
 
-    filter_subq = select(
-        Item.id
-    ).join(
-        ItemCharacteristic, Item.id == ItemCharacteristic.item_id
-    ).filter(
-        and_(*where_opts)
-    ).subquery()
+    return where_opts
 
-    query = select(
-        func.count(Item.id).over().label("count"), 
-        Item, 
-        Category, 
-        func.array_agg(
-            func.jsonb_build_object(
-                "id", Characteristic.id,
-                "name", Characteristic.name,
-                "value", ItemCharacteristic.value
-            ).distinct()
-        ).label("characteristics"),
-        func.array_agg(
-            func.jsonb_build_object(
-                "id", Review.id,
-                "name", Review.name,
-                "description", Review.description,
-                "stars", Review.stars,
-                "created_at", Review.created_at
-            ).distinct()
-        ).label("reviews")
-    ).outerjoin(
-        Category,
-        Item.category_id == Category.id
-    ).outerjoin(
-        ItemCharacteristic,
-        Item.id == ItemCharacteristic.item_id
-    ).outerjoin(
-        Characteristic,
-        ItemCharacteristic.characteristic_id == Characteristic.id
-    ).outerjoin(
-        Review,
-        Item.id == Review.item_id
+def _item_sort_column(sort_by: str, keywords: str | BindParameter):
+    if sort_by == "relevance":
+        return search_backend.relevance(Item.name, Item.description, keywords)
+    if sort_by == "rating":
+        return Item.rating_avg
+    return getattr(Item, sort_by)
+
+_ITEM_FIELDS = frozenset(get_args(ItemField))
+
+_item_field_columns = {
+    "name": (Item.name,),
+    "description": (Item.description,),
+    "price": (Item.price,),
+    "category": (
+        Category.id.label("category_id"),
+        Category.name.label("category_name"),
+        Category.description.label("category_description")
+    ),
+    "rating": (Item.reviews_count, Item.rating_avg, Item.rating_histogram)
+}
+
+def _item_fields(fields: list[str] | None) -> frozenset[str]:
+    return frozenset(fields) if fields else _ITEM_FIELDS
+
+def _item_select(fields: frozenset[str], *columns):
+    """Item id, the columns of the requested fields and `columns`; joins categories only when asked for."""
+    query = select(*columns, Item.id, *(
+        column for field, field_columns in _item_field_columns.items() if field in fields for column in field_columns
+    ))
+    if "category" in fields:
+        query = query.join(Category, Item.category_id == Category.id)
+    return query
+
+async def _item_relations(db: AsyncSession, fields: frozenset[str], item_ids: list[UUID]) -> tuple[dict, dict]:
+    """Characteristics and reviews of `item_ids`, each loaded only when requested."""
+    characteristics = await _load_characteristics(db, item_ids) if "characteristics" in fields else {}
+    reviews = await _load_reviews(db, item_ids) if "reviews" in fields else {}
+    return characteristics, reviews
+
+def _item_response(row, fields: frozenset[str], characteristics: dict, reviews: dict) -> dict:
+    """ItemResponse shape as a plain dict holding only `fields`."""
+    response = {"id": row.id}
+    for field in ("name", "description", "price"):
+        if field in fields:
+            response[field] = getattr(row, field)
+    if "category" in fields:
+        response["category"] = {"id": row.category_id, "name": row.category_name, "description": row.category_description}
+    if "characteristics" in fields:
+        response["characteristics"] = characteristics.get(row.id, [])
+    if "rating" in fields:
+        response.update(rating_response(row))
+    if "reviews" in fields:
+        response["reviews"] = reviews.get(row.id, [])
+    return response
+
+class _FilterShape(NamedTuple):
+    """Which optional parts an /items/filter page has; requests of one shape share one statement."""
+    category: bool
+    min_price: bool
+    max_price: bool
+    min_rating: bool
+    characteristics: int
+    keywords: bool
+    sort_by: str
+    sort_dir: str
+    count_mode: str
+    cursor: bool
+    fields: frozenset[str]
+
+def _filter_shape(request: ItemFilterRequest, fields: frozenset[str]) -> _FilterShape:
+    return _FilterShape(
+        category=bool(request.category),
+        min_price=bool(request.min_price),
+        max_price=bool(request.max_price),
+        min_rating=bool(request.min_rating),
+        characteristics=len(_characteristic_pairs(request.characteristics or [])),
+        keywords=bool(request.keywords),
+        sort_by=request.sort_by,
+        sort_dir=request.sort_dir,
+        count_mode=request.count_mode,
+        cursor=bool(request.cursor),
+        fields=fields
+    )
+
+@lru_cache(maxsize=512)
+def _items_page_statement(shape: _FilterShape):
+    """
+    One page of items (plus one row to detect the next page), no fan-out joins.
+    Every value is a named bound parameter, so the statement is built once per shape and its
+    compiled form and the connections' prepared statements are reused; values come from `_items_page_params`.
+    """
+    keywords = bindparam("keywords", type_=String) if shape.keywords else ""
+    where_opts = []
+    if shape.category:
+        where_opts.append(Item.category_id == bindparam("category"))
+    if shape.min_price:
+        where_opts.append(Item.price >= bindparam("min_price"))
+    if shape.max_price:
+        where_opts.append(Item.price <= bindparam("max_price"))
+    if shape.min_rating:
+        where_opts.append(Item.rating_avg >= bindparam("min_rating"))
+    if shape.characteristics:
+        pairs = [(bindparam(f"characteristic_{n}"), bindparam(f"value_{n}")) for n in range(shape.characteristics)]
+        where_opts.append(Item.id.in_(_characteristics_filter(pairs)))
+    if shape.keywords:
+        where_opts.append(search_backend.filter(Item.name, Item.description, keywords))
+
+    sort_column = _item_sort_column(shape.sort_by, keywords)
+    query = _item_select(
+        shape.fields,
+        count_column(shape.count_mode, Item.id, shape.cursor),
+        sort_column.label("sort_key")
     ).where(
-        Item.id.in_(filter_subq)
-    ).order_by(
-        sort_dir_map[request.sort_dir](request.sort_by)
-    ).limit(request.limit).offset(offset).group_by(
-        Item.id, Category.id
+        *where_opts
+    ).limit(bindparam("limit", type_=Integer)).offset(bindparam("offset", type_=Integer))
+    query = apply_keyset(query, sort_column, Item.id, shape.sort_dir, None, shape.sort_by)
+    if shape.cursor:
+        query = query.where(keyset_seek(
+            sort_column,
+            Item.id,
+            shape.sort_dir,
+            bindparam("cursor_value", type_=sort_column.type),
+            bindparam("cursor_id", type_=Item.id.type)
+        ))
+    return query
+
+def _items_page_params(request: ItemFilterRequest) -> dict:
+    params = {"limit": request.limit + 1, "offset": page_offset(request.page, request.limit, request.cursor)}
+    if request.category:
+        params["category"] = request.category
+    if request.min_price:
+        params["min_price"] = request.min_price
+    if request.max_price:
+        params["max_price"] = request.max_price
+    if request.min_rating:
+        params["min_rating"] = request.min_rating
+    for n, (id, value) in enumerate(_characteristic_pairs(request.characteristics or [])):
+        params[f"characteristic_{n}"] = id
+        params[f"value_{n}"] = value
+    if request.keywords:
+        params["keywords"] = request.keywords
+    if request.cursor:
+        params["cursor_value"], params["cursor_id"] = decode_cursor(request.cursor, request.sort_by)
+    return params
+
+def _item_version_query(id: UUID):
+    return select(Item.updated_at, latest_review_at(Review, Review.item_id, Item.id)).where(Item.id == id)
+
+async def _items_page_entry(
+        request: ItemFilterRequest, db: AsyncSession, cache_key: str, http_request: Request | None = None) -> bytes:
+    # Only estimates and exact counts of cursor pages query the bare filter; otherwise the tree isn't built
+    counts_filter = request.count_mode == "estimate" or (request.count_mode == "exact" and request.cursor)
+    filter_query = select(Item.id).where(*_item_filter_opts(request)) if counts_filter else None
+    fields = _item_fields(request.fields)
+
+    # Phase one: only the page of items, no fan-out joins.
+    items = await db_execute(
+        db, _items_page_statement(_filter_shape(request, fields)), with_result="raw_all", params=_items_page_params(request)
     )
-    
-    items: list[Item] = await db_execute(db, query, with_result="raw_all")
 
-    count = 0
+    window_count = None
     if items:
-        count, *_ = items[0]
-
-    response_items = []
-    for _, item, category, characteristcs, reviews in items:
-        characteristcs_response = []
-        reviews_response = []
-        for characteristic in characteristcs:
-            if not all([characteristic.get(key) for key in characteristic.keys()]): 
-                continue
-            characteristc_response = CharacteristicResponse.model_validate(characteristic)
-            characteristcs_response.append(characteristc_response)
-
-        for review in reviews:
-            if not all([review.get(key) for key in review.keys()]): 
-                continue
-            review_response = ReviewResponse.model_validate(review)
-            reviews_response.append(review_response)
-
-        response_items.append(
-            ItemResponse(
-                id=item.id,
-                name=item.name,
-                description=item.description,
-                price=item.price,
-                category=CategoryResponse(
-                    id=category.id,
-                    name=category.name,
-                    description=category.description
-                ),
-                characteristics=characteristcs_response if characteristcs_response else [],
-                reviews=reviews_response if reviews_response else []
-            )
-        )
+        window_count = items[0].count
+    count = await resolve_count(
+        db, request.count_mode, window_count, filter_query, filter_fingerprint("items", request), request.cursor
+    )
+
+    next_cursor = None
+    if len(items) > request.limit:
+        items = items[:request.limit]
+        next_cursor = encode_cursor(request.sort_by, items[-1].sort_key, items[-1].id)
+
+    # Phase two: hydrate the page with one batched query per requested relation.
+    characteristics, reviews = await _item_relations(db, fields, [item.id for item in items])
 
-    return ItemsPaginationResponse(
-        page=request.page,
-        limit=request.limit,
-        count=count,
-        items = response_items
+    # Plain dicts in the ItemsPaginationResponse shape, encoded once by store_entry.
+    response = {
+        "page": request.page,
+        "limit": request.limit,
+        "count": count,
+        "next_cursor": next_cursor,
+        "items": [_item_response(item, fields, characteristics, reviews) for item in items]
+    }
+    return await store_entry(
+        cache_key, response, ITEMS_LIST_CACHE_TTL, tags=["items:list"], headers={"Cache-Control": CACHE_CONTROL_ITEMS_LIST},
+        request=http_request
     )
 
-@router.get("/{id}", response_model=ItemResponse)
-async def get_item(
-    id: UUID = Path(),
-    db: AsyncSession = Depends(get_db)
+@router.post("/filter", response_model=ItemsPaginationResponse)
+async def filter_items(
+    request: ItemFilterRequest=Body(default=ItemFilterRequest()),
+    db: AsyncSession = Depends(get_read_db),
+    http_request: Request = None
     ):
-    item_category_query = select(
-        Item, 
-        Category
+    cache_key = request_key("items:list", request)
+    if cached := await cached_response(cache_key, http_request):
+        return cached
+
+    # Identical requests missing the cache together share one run of the queries
+    return await shared_response(cache_key, http_request, lambda: _items_page_entry(request, db, cache_key, http_request))
+
+_EXPORT_CSV_COLUMNS = ["id", "name", "description", "price", "category_id", "category_name", "characteristics"]
+
+def _export_query(request: ItemFilterRequest):
+    characteristics = select(
+        func.coalesce(
+            func.jsonb_agg(
+                func.jsonb_build_object(
+                    "id", Characteristic.id,
+                    "name", Characteristic.name,
+                    "value", ItemCharacteristic.value
+                )
+            ),
+            text("'[]'::jsonb")
+        )
+    ).select_from(ItemCharacteristic).join(
+        Characteristic,
+        Characteristic.id == ItemCharacteristic.characteristic_id
+    ).where(
+        ItemCharacteristic.item_id == Item.id
+    ).scalar_subquery()
+
+    query = select(
+        Item.id,
+        Item.name,
+        Item.description,
+        Item.price,
+        Category.id,
+        Category.name,
+        Category.description,
+        characteristics
     ).join(
         Category,
-        Item.category_id == Category.id 
+        Item.category_id == Category.id
     ).where(
-        Item.id == id
+        *_item_filter_opts(request)
     )
+    return apply_keyset(query, _item_sort_column(request.sort_by, request.keywords), Item.id, request.sort_dir, None, request.sort_by)
 
-    reviews_query = select(
-        Review
-    ).where(
-        Review.item_id == id
-    ).order_by(
-        Review.created_at.desc()
+def _export_ndjson(rows) -> str:
+    return "".join(
+        json.dumps({
+            "id": str(id),
+            "name": name,
+            "description": description,
+            "price": price,
+            "category": {"id": str(category_id), "name": category_name, "description": category_description},
+            "characteristics": characteristics
+        }) + "\n"
+        for id, name, description, price, category_id, category_name, category_description, characteristics in rows
     )
 
-    characteristics_query = select(
-        Characteristic,
-        ItemCharacteristic.value
-    ).select_from(ItemCharacteristic).join(
-        Characteristic,
-        Characteristic.id == ItemCharacteristic.characteristic_id
+def _export_csv(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(_EXPORT_CSV_COLUMNS)
+    writer.writerows(
+        (id, name, description, price, category_id, category_name, json.dumps(characteristics))
+        for id, name, description, price, category_id, category_name, _, characteristics in rows
+    )
+    return buffer.getvalue()
+
+@router.post("/export", response_class=StreamingResponse, description="Stream every matching item as NDJSON or CSV")
+async def export_items(
+    http_request: Request,
+    request: ItemFilterRequest = Body(default=ItemFilterRequest()),
+    format: Literal["ndjson", "csv"] = Query(default="ndjson")
+    ):
+    query = _export_query(request).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    # The session has to outlive the endpoint, so it is opened inside the generator.
+    session_factory = read_session_factory(http_request)
+    encode = _export_ndjson if format == "ndjson" else _export_csv
+
+    async def generate():
+        if format == "csv":
+            yield _export_csv([], header=True)
+        async with session_factory() as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield encode(rows)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=items.{format}"}
+    )
+
+@router.post("/facets", response_model=ItemFacetsResponse)
+async def item_facets(
+    request: ItemFilterRequest=Body(default=ItemFilterRequest()),
+    db: AsyncSession = Depends(get_read_db),
+    http_request: Request = None
+    ):
+    fingerprint = filter_fingerprint("facets", request)
+    cached = None if bypasses_cache(http_request) else facets_cache.get(fingerprint)
+    if cached is not None:
+        return cached
+
+    category_grouping = func.grouping(Item.category_id).label("category_grouping")
+    query = select(
+        category_grouping,
+        Item.category_id,
+        ItemCharacteristic.characteristic_id,
+        ItemCharacteristic.value,
+        func.count(Item.id.distinct()).label("count")
+    ).outerjoin(
+        ItemCharacteristic,
+        Item.id == ItemCharacteristic.item_id
     ).where(
-        ItemCharacteristic.item_id == id
+        *_item_filter_opts(request)
+    ).group_by(
+        func.grouping_sets(
+            tuple_(Item.category_id),
+            tuple_(ItemCharacteristic.characteristic_id, ItemCharacteristic.value)
+        )
     )
 
-    item, category = await db_execute(db, item_category_query, with_result="raw_one")
+    categories = []
+    characteristics = []
+    for grouping, category_id, characteristic_id, value, count in await db_execute(db, query, with_result="raw_all"):
+        if grouping == 0:
+            categories.append(CategoryFacet(id=category_id, count=count))
+        elif characteristic_id:
+            characteristics.append(CharacteristicFacet(id=characteristic_id, value=value, count=count))
 
-    if not item:
+    response = ItemFacetsResponse(categories=categories, characteristics=characteristics)
+    if may_cache(http_request):
+        facets_cache.set(fingerprint, response)
+    return response
+
+async def _item_entry(
+        db: AsyncSession,
+        id: UUID,
+        fields: frozenset[str],
+        cache_key: str,
+        headers: dict,
+        http_request: Request | None) -> bytes:
+    row = await db_execute(db, _item_select(fields).where(Item.id == id), with_result="raw_one")
+
+    if not row:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Item not found")
+
+    characteristics, reviews = await _item_relations(db, fields, [id])
+    response = _item_response(row, fields, characteristics, reviews)
+
+    tags = [f"item:{id}", *(f"characteristic:{char['id']}" for char in characteristics.get(id, []))]
+    if "category" in fields:
+        tags.append(f"category:{row.category_id}")
+    return await store_entry(cache_key, response, ITEM_DETAIL_CACHE_TTL, tags=tags, headers=headers, request=http_request)
+
+@router.get("/{id}", response_model=ItemResponse)
+async def get_item(
+    id: UUID = Path(),
+    fields: list[ItemField] | None = Query(default=None, description="Fields to return besides `id`; all when omitted"),
+    db: AsyncSession = Depends(get_read_db),
+    http_request: Request = None
+    ):
+    fields = _item_fields(fields)
+    variant = ",".join(sorted(fields))
+    # Projections are cached beside the full response and evicted with it through the item tag
+    cache_key = f"item:{id}" if fields == _ITEM_FIELDS else f"item:{id}:{variant}"
+    if cached := await cached_response(cache_key, http_request):
+        return cached
+
+    # Revalidation only needs the version, not the relations; concurrent misses of one item share both lookups
+    lookup = lambda: db_execute(db, _item_version_query(id), with_result="raw_one")
+    version = await (lookup() if bypasses_cache(http_request) else response_flights.do(f"item:{id}:version", lookup))
+    if not version:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Item not found")
-    
-    reviews = await db_execute(db, reviews_query, with_result="all")
-    characteristics = await db_execute(db, characteristics_query, with_result="raw_all")
-
-    response = ItemResponse(
-        id=id,
-        name=item.name,
-        description=item.description,
-        price=item.price,
-        category={"id": category.id, "name": category.name, "description": category.description},
-        characteristics=[
-            {"id": char.id, "name": char.name, "value": value}
-            for char, value in characteristics
-        ],
-        reviews=[
-            {"id": review.id, "name": review.name, "description": review.description, "stars": review.stars, "created_at": review.created_at}
-            for review in reviews
-        ]
+    headers = version_headers(CACHE_CONTROL_ITEM_DETAIL, *version, variant=variant)
+    if is_not_modified(http_request, headers):
+        return not_modified_response(headers)
+
+    return await shared_response(cache_key, http_request, lambda: _item_entry(db, id, fields, cache_key, headers, http_request))
+
+async def prime_statements(db: AsyncSession):
+    """Runs the hot reads in the shape of default requests, reading no rows, so the connection has them prepared."""
+    missing = UUID(int=0)
+    request = ItemFilterRequest()
+    await db_execute(
+        db, _items_page_statement(_filter_shape(request, _ITEM_FIELDS)), params={**_items_page_params(request), "limit": 0}
     )
-    return response
+    await db_execute(db, _item_version_query(missing))
+    await db_execute(db, _item_select(_ITEM_FIELDS).where(Item.id == missing))
+    await _item_relations(db, _ITEM_FIELDS, [missing])
 
-@router.patch("/", status_code=status.HTTP_204_NO_CONTENT)
-async def upsert_item(
-    request: ItemUpsertRequest = Body(default=ItemUpsertRequest()),
-    db: AsyncSession = Depends(get_db)
+@router.get("/{id}/reviews", response_model=ReviewsPaginationResponse, tags=["reviews"])
+async def list_item_reviews(
+    id: UUID = Path(),
+    request: ReviewsPageRequest = Query(default=ReviewsPageRequest()),
+    db: AsyncSession = Depends(get_read_db),
+    http_request: Request = None
     ):
-    if request.id:
-        await db.execute(
-            delete(ItemCharacteristic).where(ItemCharacteristic.item_id == request.id)
-        )
-    else:
-        request.id = str(uuid4())
-
-    query = insert(Item).values(
-        id=request.id,
-        name=request.name,
-        description=request.description,
-        price=request.price,
-        category_id=request.category
-    ).on_conflict_do_update(
+    cache_key = request_key(f"item:{id}:reviews", request)
+    if cached := await cached_response(cache_key, http_request):
+        return cached
+
+    count = await db_execute(db, select(Item.reviews_count).where(Item.id == id), with_result="one")
+    if count is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Item not found")
+
+    reviews, next_cursor = await reviews_page(db, Review, Review.item_id, id, request.limit, request.cursor)
+
+    response = {"limit": request.limit, "count": count, "next_cursor": next_cursor, "items": reviews}
+    return await store_response(
+        cache_key, response, REVIEWS_CACHE_TTL, tags=[f"item:{id}:reviews"],
+        headers={"Cache-Control": CACHE_CONTROL_REVIEWS}, request=http_request
+    )
+
+async def _upsert_items_batch(db: AsyncSession, batch: list[ItemUpsertRequest]) -> tuple[int, int, int]:
+    """
+    Upserts items and diffs their characteristics in a fixed number of statements.
+    Rows are passed as arrays and expanded with unnest, so round trips don't grow with the batch;
+    the derived column list names unnest's columns, which Postgres otherwise calls all `unnest`.
+    Returns (items, characteristics upserted, characteristics deleted).
+    """
+    items = {request.id: request for request in batch}
+    characteristics = {
+        (item_id, characteristic.id): characteristic.value
+        for item_id, request in items.items()
+        for characteristic in request.characteristics
+    }
+
+    item_rows = func.unnest(
+        bindparam("ids", list(items), type_=ARRAY(Item.id.type)),
+        bindparam("names", [request.name for request in items.values()], type_=ARRAY(Item.name.type)),
+        bindparam("descriptions", [request.description for request in items.values()], type_=ARRAY(Item.description.type)),
+        bindparam("prices", [float(request.price) for request in items.values()], type_=ARRAY(Item.price.type)),
+        bindparam("categories", [request.category for request in items.values()], type_=ARRAY(Item.category_id.type))
+    ).table_valued("id", "name", "description", "price", "category_id").render_derived()
+
+    items_query = insert(Item).from_select(
+        ["id", "name", "description", "price", "category_id"],
+        select(item_rows.c.id, item_rows.c.name, item_rows.c.description, item_rows.c.price, item_rows.c.category_id)
+    )
+    items_query = items_query.on_conflict_do_update(
         index_elements=[Item.id],
         set_={
-            Item.name: request.name,
-            Item.description: request.description,
-            Item.price: request.price,
-            Item.category_id: request.category
+            Item.name: items_query.excluded.name,
+            Item.description: items_query.excluded.description,
+            Item.price: items_query.excluded.price,
+            Item.category_id: items_query.excluded.category_id,
+            Item.updated_at: func.now()
         },
-        where=(Item.id == request.id)
-    ).returning(Item.id)
+        where=tuple_(Item.name, Item.description, Item.price, Item.category_id).is_distinct_from(
+            tuple_(
+                items_query.excluded.name,
+                items_query.excluded.description,
+                items_query.excluded.price,
+                items_query.excluded.category_id
+            )
+        )
+    )
+    await db.execute(items_query)
 
-    item_id = (await db.execute(query)).scalar()
+    characteristic_rows = func.unnest(
+        bindparam("item_ids", [item_id for item_id, _ in characteristics], type_=ARRAY(ItemCharacteristic.item_id.type)),
+        bindparam("characteristic_ids", [id for _, id in characteristics], type_=ARRAY(ItemCharacteristic.characteristic_id.type)),
+        bindparam("values", list(characteristics.values()), type_=ARRAY(ItemCharacteristic.value.type))
+    ).table_valued("item_id", "characteristic_id", "value").render_derived()
 
-    for characteristic in request.characteristics:
-        await db.execute(
-            insert(ItemCharacteristic).values(
-                item_id=item_id,
-                characteristic_id=characteristic.id,
-                value=characteristic.value
+    deleted = (await db.execute(
+        delete(ItemCharacteristic).where(
+            ItemCharacteristic.item_id == any_(bindparam("batch_ids", list(items), type_=ARRAY(Item.id.type))),
+            tuple_(ItemCharacteristic.item_id, ItemCharacteristic.characteristic_id).not_in(
+                select(characteristic_rows.c.item_id, characteristic_rows.c.characteristic_id)
             )
+        ).returning(ItemCharacteristic.item_id)
+    )).scalars().all()
+
+    upserted = []
+    if characteristics:
+        characteristics_query = insert(ItemCharacteristic).from_select(
+            ["item_id", "characteristic_id", "value"],
+            select(characteristic_rows.c.item_id, characteristic_rows.c.characteristic_id, characteristic_rows.c.value)
         )
-    
+        characteristics_query = characteristics_query.on_conflict_do_update(
+            index_elements=[ItemCharacteristic.item_id, ItemCharacteristic.characteristic_id],
+            set_={ItemCharacteristic.value: characteristics_query.excluded.value},
+            where=ItemCharacteristic.value.is_distinct_from(characteristics_query.excluded.value)
+        )
+        upserted = (await db.execute(characteristics_query.returning(ItemCharacteristic.item_id))).scalars().all()
+
+    # Characteristics are part of the item's version, so a change to them moves updated_at (and the ETag)
+    changed = set(deleted) | set(upserted)
+    if changed:
+        await db.execute(
+            update(Item).where(
+                Item.id == any_(bindparam("changed_ids", list(changed), type_=ARRAY(Item.id.type)))
+            ).values(updated_at=func.now())
+        )
+
+    return len(items), len(upserted), len(deleted)
+
+@router.patch("/", status_code=status.HTTP_204_NO_CONTENT)
+async def upsert_item(
+    request: ItemUpsertRequest = Body(default=ItemUpsertRequest()),
+    db: AsyncSession = Depends(get_write_db)
+    ):
+    if not request.id:
+        request.id = uuid4()
+
+    await _upsert_items_batch(db, [request])
+
+    await db.commit()
+    await response_cache.delete_tags(f"item:{request.id}", "items:list")
+
+async def _bulk_request_items(request: Request) -> AsyncIterator[ItemUpsertRequest]:
+    """Yields items from a JSON array body or, for application/x-ndjson, one item per line as it streams in."""
+    if not request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        try:
+            items = _bulk_items_adapter.validate_json(await request.body())
+        except ValidationError as e:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, e.errors(include_url=False))
+        for item in items:
+            yield item
+        return
+
+    line_number = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _parse_ndjson_item(line, line_number)
+    if buffer.strip():
+        yield _parse_ndjson_item(buffer, line_number + 1)
+
+def _parse_ndjson_item(line: bytes, line_number: int) -> ItemUpsertRequest:
+    try:
+        return ItemUpsertRequest.model_validate_json(line)
+    except ValidationError as e:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            {"line": line_number, "errors": e.errors(include_url=False)}
+        )
+
+async def _commit_bulk_batch(db: AsyncSession, batch: list[ItemUpsertRequest], number: int) -> BulkBatchReport:
+    started = time.perf_counter()
+    for item in batch:
+        if not item.id:
+            item.id = uuid4()
+
+    items, upserted, deleted = await _upsert_items_batch(db, batch)
     await db.commit()
+    await response_cache.delete_tags(*(f"item:{item.id}" for item in batch))
+
+    return BulkBatchReport(
+        batch=number,
+        items=items,
+        characteristics_upserted=upserted,
+        characteristics_deleted=deleted,
+        seconds=time.perf_counter() - started
+    )
+
+@router.post(
+    "/bulk",
+    response_model=BulkUpsertResponse,
+    description=f"Upsert items from a JSON array or an application/x-ndjson stream, {BULK_BATCH_SIZE} items per transaction"
+)
+async def bulk_upsert_items(
+    request: Request,
+    db: AsyncSession = Depends(get_write_db)
+    ):
+    started = time.perf_counter()
+    reports = []
+    pending = []
+    try:
+        async for item in _bulk_request_items(request):
+            pending.append(item)
+            if len(pending) >= BULK_BATCH_SIZE:
+                reports.append(await _commit_bulk_batch(db, pending, len(reports) + 1))
+                pending = []
+        if pending:
+            reports.append(await _commit_bulk_batch(db, pending, len(reports) + 1))
+    finally:
+        if reports:
+            await response_cache.delete_tags("items:list")
+
+    return BulkUpsertResponse(
+        items=sum(report.items for report in reports),
+        characteristics_upserted=sum(report.characteristics_upserted for report in reports),
+        characteristics_deleted=sum(report.characteristics_deleted for report in reports),
+        seconds=time.perf_counter() - started,
+        batches=reports
+    )
 
 @router.post("/{id}/review", tags=["reviews"])
 async def add_review(
     id: UUID = Path(),
     request: ReviewRequest = Body(default=ReviewRequest()),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
     ):
+    # Updating the aggregates first locks the item, so concurrent reviews apply one after another
+    updated = await db.execute(
+        update(Item).where(Item.id == id).values(rating_increment(Item, request.stars)).returning(Item.id)
+    )
+    if updated.scalar() is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Item not found")
+
     await db.execute(
         insert(Review).values(
             item_id=id,
@@ -258,4 +756,5 @@ async def add_review(
     )
 
     await db.commit()
+    await response_cache.delete_tags(f"item:{id}", "items:list", f"item:{id}:reviews")
     return status.HTTP_204_NO_CONTENT
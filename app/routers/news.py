@@ -1,134 +1,207 @@
-from fastapi import APIRouter, Body, Path, status, Query, Depends
+from fastapi import APIRouter, Body, Path, status, Query, Depends, HTTPException, Request
 
 from uuid import uuid4, UUID
+from typing import get_args
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, update, func
 
 from models.db import News, Review
-from lib.db.engine import get_db, db_execute
-
-from models.app.request import PaginationRequest, ReviewRequest, NewsUpsertRequest
-from models.app.response import NewsPaginationResponse, NewsResponse, ReviewResponse
+from lib.db.engine import get_read_db, get_write_db, db_execute
+from lib.db.pagination import apply_keyset, encode_cursor, page_offset
+from lib.db.counting import count_column, filter_fingerprint, resolve_count
+from lib.db.search import search_backend
+from lib.db.ratings import rating_increment, rating_response
+from lib.db.reviews import embedded_reviews, latest_review_at, reviews_page
+from lib.cache.backend import response_cache, request_key, cached_response, store_response
+from lib.cache.conditional import version_headers, is_not_modified, not_modified_response
+from lib.config import (
+    NEWS_DETAIL_CACHE_TTL,
+    NEWS_LIST_CACHE_TTL,
+    REVIEWS_CACHE_TTL,
+    EMBEDDED_REVIEWS_LIMIT,
+    CACHE_CONTROL_NEWS_DETAIL,
+    CACHE_CONTROL_NEWS_LIST,
+    CACHE_CONTROL_REVIEWS
+)
+
+from models.app.request import NewsListRequest, NewsField, ReviewRequest, ReviewsPageRequest, NewsUpsertRequest
+from models.app.response import NewsPaginationResponse, NewsResponse, ReviewsPaginationResponse
 
 router = APIRouter()
 
-async def _list_news_helper(
-        request: PaginationRequest = Query(default=PaginationRequest()),
-        db: AsyncSession = Depends(get_db),
-        news_id: UUID = None
-    ):
-    where_opts = []
+def _news_keywords_filter(keywords: str):
+    return search_backend.filter(News.name, News.description, keywords)
+
+_NEWS_FIELDS = frozenset(get_args(NewsField))
+
+_news_field_columns = {
+    "name": (News.name,),
+    "description": (News.description,),
+    "created_at": (News.created_at,),
+    "updated_at": (News.updated_at,),
+    "rating": (News.reviews_count, News.rating_avg, News.rating_histogram)
+}
+
+def _news_fields(fields: list[str] | None) -> frozenset[str]:
+    return frozenset(fields) if fields else _NEWS_FIELDS
+
+def _news_query(request: NewsListRequest | None, news_id: UUID | None, fields: frozenset[str]):
     if news_id:
-        where_opts.append(News.id == news_id)
-        request.limit = 1
-        request.page = 1
+        where_opt = News.id == news_id
+        request = NewsListRequest(page=1, limit=1)
     else:
-        where_opts = [
-            News.name.icontains(request.keywords),
-            News.description.icontains(request.keywords)
-        ]
+        where_opt = _news_keywords_filter(request.keywords)
+
+    columns = [
+        count_column(request.count_mode, News.id, bool(request.cursor)),
+        News.id,
+        News.updated_at.label("sort_key"),
+        *(column for field, field_columns in _news_field_columns.items() if field in fields for column in field_columns)
+    ]
+    if "reviews" in fields:
+        columns.append(embedded_reviews(Review, Review.news_id, News.id, EMBEDDED_REVIEWS_LIMIT).label("reviews"))
 
     query = select(
-        func.count(News.id).over().label("count"),
-        News,
-        func.array_agg(
-            func.jsonb_build_object(
-                "id", Review.id,
-                "name", Review.name,
-                "description", Review.description,
-                "stars", Review.stars,
-                "created_at", Review.created_at
-            ).distinct()
-        ).label("reviews")
-    ).outerjoin(
-        Review,
-        Review.news_id == News.id
-    ).order_by(
-        News.updated_at.desc()
+        *columns
     ).limit(
-        request.limit
+        request.limit + 1
     ).offset(
-        (request.page - 1) * request.limit
-    ).group_by(
-        News.id
+        page_offset(request.page, request.limit, request.cursor)
     ).where(
-        or_(
-            *where_opts
-        )
+        where_opt
     )
+    return apply_keyset(query, News.updated_at, News.id, "desc", request.cursor, "updated_at")
+
+def _news_version_query(id: UUID):
+    return select(News.updated_at, latest_review_at(Review, Review.news_id, News.id)).where(News.id == id)
 
-    return await db_execute(db, query, with_result="raw_all")
+async def _list_news_helper(
+        request: NewsListRequest = None,
+        db: AsyncSession = Depends(get_read_db),
+        news_id: UUID = None,
+        fields: frozenset[str] = _NEWS_FIELDS
+    ):
+    return await db_execute(db, _news_query(request, news_id, fields), with_result="raw_all")
+
+def _news_response(row, fields: frozenset[str]) -> dict:
+    """NewsResponse shape as a plain dict holding only `fields`; reviews arrive from Postgres in their final form."""
+    response = {"id": row.id}
+    for field in ("name", "description", "created_at", "updated_at"):
+        if field in fields:
+            response[field] = getattr(row, field)
+    if "rating" in fields:
+        response.update(rating_response(row))
+    if "reviews" in fields:
+        response["reviews"] = row.reviews or []
+    return response
 
 @router.get("/", response_model=NewsPaginationResponse, description="List news")
 async def list_news(
-    request: PaginationRequest = Query(default=PaginationRequest()),
-    db: AsyncSession = Depends(get_db)
+    request: NewsListRequest = Query(default=NewsListRequest()),
+    db: AsyncSession = Depends(get_read_db),
+    http_request: Request = None
 ):
-    news = await _list_news_helper(request, db)
-    count = 0
+    cache_key = request_key("news:list", request)
+    if cached := await cached_response(cache_key, http_request):
+        return cached
+
+    fields = _news_fields(request.fields)
+    news = await _list_news_helper(request, db, fields=fields)
+    window_count = None
     if news:
-        count, *_ = news[0]
-
-    items = []
-    for _, news_, reviews in news:
-        reviews_response = []
-        for review in reviews:
-            if not all([review.get(key) for key in review.keys()]): 
-                continue
-            review_response = ReviewResponse.model_validate(review)
-            reviews_response.append(review_response)
-
-        items.append(
-            NewsResponse(
-                id=news_.id,
-                name=news_.name,
-                description=news_.description,
-                created_at=news_.created_at,
-                updated_at=news_.updated_at,
-                reviews=reviews_response
-            )
-        )
+        window_count = news[0].count
+    count = await resolve_count(
+        db,
+        request.count_mode,
+        window_count,
+        select(News.id).where(_news_keywords_filter(request.keywords)),
+        filter_fingerprint("news", request),
+        request.cursor
+    )
 
-    return NewsPaginationResponse(
-        page=request.page,
-        limit=request.limit,
-        count=count,
-        items = items
+    next_cursor = None
+    if len(news) > request.limit:
+        news = news[:request.limit]
+        next_cursor = encode_cursor("updated_at", news[-1].sort_key, news[-1].id)
+
+    response = {
+        "page": request.page,
+        "limit": request.limit,
+        "count": count,
+        "next_cursor": next_cursor,
+        "items": [_news_response(row, fields) for row in news]
+    }
+    return await store_response(
+        cache_key, response, NEWS_LIST_CACHE_TTL, tags=["news:list"],
+        headers={"Cache-Control": CACHE_CONTROL_NEWS_LIST}, request=http_request
     )
 
 @router.get("/{id}", response_model=NewsResponse, description="Get news by id")
 async def get_news(
     id: UUID = Path(),
-    db: AsyncSession = Depends(get_db)
+    fields: list[NewsField] | None = Query(default=None, description="Fields to return besides `id`; all when omitted"),
+    db: AsyncSession = Depends(get_read_db),
+    http_request: Request = None
     ):
-    news = await _list_news_helper(news_id=id, db=db)
+    fields = _news_fields(fields)
+    variant = ",".join(sorted(fields))
+    # Projections are cached beside the full response and evicted with it through the news tag
+    cache_key = f"news:{id}" if fields == _NEWS_FIELDS else f"news:{id}:{variant}"
+    if cached := await cached_response(cache_key, http_request):
+        return cached
+
+    version = await db_execute(db, _news_version_query(id), with_result="raw_one")
+    if not version:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "News not found")
+    headers = version_headers(CACHE_CONTROL_NEWS_DETAIL, *version, variant=variant)
+    if is_not_modified(http_request, headers):
+        return not_modified_response(headers)
+
+    news = await _list_news_helper(news_id=id, db=db, fields=fields)
     if not news:
-        return status.HTTP_404_NOT_FOUND
-    
-    _, news, reviews = news[0]
-    
-    reviews_response = []
-    for review in reviews:
-        if not all([review.get(key) for key in review.keys()]): 
-            continue
-        review_response = ReviewResponse.model_validate(review)
-        reviews_response.append(review_response)
-
-    return NewsResponse(
-        id=news.id,
-        name=news.name,
-        description=news.description,
-        created_at=news.created_at,
-        updated_at=news.updated_at,
-        reviews=reviews_response
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "News not found")
+
+    return await store_response(
+        cache_key, _news_response(news[0], fields), NEWS_DETAIL_CACHE_TTL, tags=[f"news:{id}"], headers=headers,
+        request=http_request
+    )
+
+async def prime_statements(db: AsyncSession):
+    """Runs the hot reads in the shape of default requests, reading no rows, so the connection has them prepared."""
+    missing = UUID(int=0)
+    await db_execute(db, _news_query(NewsListRequest(), None, _NEWS_FIELDS).limit(0))
+    await db_execute(db, _news_version_query(missing))
+    await db_execute(db, _news_query(None, missing, _NEWS_FIELDS))
+
+@router.get("/{id}/reviews", response_model=ReviewsPaginationResponse, tags=["reviews"], description="Page through reviews, newest first")
+async def list_news_reviews(
+    id: UUID = Path(),
+    request: ReviewsPageRequest = Query(default=ReviewsPageRequest()),
+    db: AsyncSession = Depends(get_read_db),
+    http_request: Request = None
+    ):
+    cache_key = request_key(f"news:{id}:reviews", request)
+    if cached := await cached_response(cache_key, http_request):
+        return cached
+
+    count = await db_execute(db, select(News.reviews_count).where(News.id == id), with_result="one")
+    if count is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "News not found")
+
+    reviews, next_cursor = await reviews_page(db, Review, Review.news_id, id, request.limit, request.cursor)
+
+    response = {"limit": request.limit, "count": count, "next_cursor": next_cursor, "items": reviews}
+    return await store_response(
+        cache_key, response, REVIEWS_CACHE_TTL, tags=[f"news:{id}:reviews"],
+        headers={"Cache-Control": CACHE_CONTROL_REVIEWS}, request=http_request
     )
 
 @router.patch("/", description="Upsert news", status_code=status.HTTP_204_NO_CONTENT)
 async def upsert_news(
     request: NewsUpsertRequest = Body(default=NewsUpsertRequest()),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     if request.id:
         pass
@@ -150,16 +223,22 @@ async def upsert_news(
     ).returning(News.id)
 
     item_id = (await db.execute(query)).scalar()
-    print(item_id)
 
     await db.commit()
+    await response_cache.delete_tags(f"news:{item_id}", "news:list")
 
 @router.post("/{id}/review", tags=["reviews"], description="Add review")
 async def add_review(
     id: UUID = Path(),
     request: ReviewRequest = Body(default=ReviewRequest()),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
     ):
+    updated = await db.execute(
+        update(News).where(News.id == id).values(rating_increment(News, request.stars)).returning(News.id)
+    )
+    if updated.scalar() is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "News not found")
+
     await db.execute(
         insert(Review).values(
             news_id=id,
@@ -170,4 +249,5 @@ async def add_review(
     )
 
     await db.commit()
+    await response_cache.delete_tags(f"news:{id}", "news:list", f"news:{id}:reviews")
     return status.HTTP_204_NO_CONTENT
@@ -10,6 +10,7 @@ psql -v ON_ERROR_STOP=1 \
 --command """
     create schema if not exists ${APP_DB_SCHEMA}; \
     create extension if not exists \"uuid-ossp\"; \
+    create extension if not exists pg_trgm; \
     create user ${APP_DB_USER} with password '${APP_DB_PASS}'; \
     GRANT USAGE ON SCHEMA ${APP_DB_SCHEMA} TO ${APP_DB_USER}; \
     GRANT CREATE ON SCHEMA ${APP_DB_SCHEMA} TO ${APP_DB_USER}; \